@@ -0,0 +1,48 @@
+"""
+Benchmark of the bulk insertion of data properties (bulk_triples option of the converter).
+
+Converts the same synthetic recordings with owlready2's per-attribute property setters and with bulk insertion per scene
+and reports the number of created individuals per second of both.
+
+Example:
+    python -m benchmarks.bulk_triples --folder pyauto/auto --road_users 10,100,1000
+"""
+import argparse
+
+from benchmarks import run
+
+BASE_CASE = dict(run.BASE_CASE, misc_objects=10)
+
+
+def compare_modes(road_users: list, folder: str, cp: bool = False) -> list:
+    """
+    Converts the base case with the given numbers of road users without and with bulk insertion.
+    :param road_users: The numbers of road users of the cases.
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies.
+    :return: A list of tuples of the case and the results without and with bulk insertion.
+    """
+    cases = [dict(BASE_CASE, road_users=n) for n in road_users]
+    setters = run.run(cases, folder, cp=cp, options={"bulk_triples": False})
+    bulk = run.run(cases, folder, cp=cp, options={"bulk_triples": True})
+    return list(zip(cases, setters, bulk))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default="pyauto/auto", help="folder in which A.U.T.O. is located")
+    parser.add_argument("--cp", action="store_true", help="also load the criticality phenomena ontologies")
+    parser.add_argument("--road_users", default="10,100,1000", help="comma separated numbers of road users")
+    args = parser.parse_args(argv)
+
+    results = compare_modes([int(n) for n in args.road_users.split(",")], args.folder, cp=args.cp)
+    print("%-12s %16s %16s %9s" % ("road users", "setters (ind/s)", "bulk (ind/s)", "speedup"))
+    for case, setters, bulk in results:
+        speedup = bulk["individuals_per_second"] / setters["individuals_per_second"] \
+            if setters["individuals_per_second"] and bulk["individuals_per_second"] else float("nan")
+        print("%-12d %16.1f %16.1f %8.2fx" % (case["road_users"], setters["individuals_per_second"] or 0,
+                                             bulk["individuals_per_second"] or 0, speedup))
+
+
+if __name__ == "__main__":
+    main()
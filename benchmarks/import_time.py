@@ -0,0 +1,68 @@
+"""
+Import-time benchmark of omega2auto.
+
+Measures the time of `from omega2auto import omega2auto` in fresh interpreters (excluding the interpreter's own startup)
+and checks that it stays within a budget and that none of the heavy dependencies, which are only needed once a
+conversion starts, is imported eagerly. Exits with a non-zero status if the check fails, such that it can be used as a
+gate in batch job setups.
+
+Example:
+    python -m benchmarks.import_time --runs 20 --budget 0.25
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# Budget (in s) for importing omega2auto.omega2auto, which is dominated by importing NumPy
+BUDGET = 0.25
+# Modules that must not be imported by `from omega2auto import omega2auto`
+LAZY_MODULES = ["pyauto", "owlready2", "omega_format", "shapely", "h5py"]
+
+_MEASURE = """
+import json, sys, time
+start = time.perf_counter()
+from omega2auto import omega2auto
+elapsed = time.perf_counter() - start
+print(json.dumps({"time": elapsed, "modules": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure(runs: int = 10) -> dict:
+    """
+    Imports omega2auto.omega2auto in the given number of fresh interpreters.
+    :param runs: The number of interpreters to measure.
+    :return: A dictionary with the median, minimum and maximum import time and the eagerly imported heavy modules.
+    """
+    times = []
+    modules = set()
+    for _ in range(runs):
+        output = subprocess.check_output([sys.executable, "-c", _MEASURE], text=True)
+        result = json.loads(output.strip().splitlines()[-1])
+        times.append(result["time"])
+        modules.update(result["modules"])
+    return {"median": statistics.median(times), "min": min(times), "max": max(times), "eager_modules": sorted(modules)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="number of fresh interpreters to measure")
+    parser.add_argument("--budget", type=float, default=BUDGET, help="maximum median import time (in s)")
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs)
+    print("Import time of omega2auto.omega2auto: median %.1f ms (min %.1f ms, max %.1f ms, budget %.1f ms)" % (
+        1000 * result["median"], 1000 * result["min"], 1000 * result["max"], 1000 * args.budget))
+    ok = True
+    if result["eager_modules"]:
+        print("Eagerly imported modules: " + ", ".join(result["eager_modules"]))
+        ok = False
+    if result["median"] > args.budget:
+        print("Import time exceeds budget")
+        ok = False
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Scaling benchmark of the OMEGA to A.U.T.O. conversion on synthetic recordings.
+
+Varies one axis of the synthetic recording at a time (starting from a base case) and measures throughput, per-frame
+latency and peak memory of the conversion. Each case runs in a fresh process, such that peak memory is not influenced by
+previous cases. Results are stored as JSON (by default under benchmarks/results/<git revision>.json) and can be
+compared to the results of another commit.
+
+Example:
+    python -m benchmarks.run --folder pyauto/auto --axis road_users=10,100,1000 --axis frames=100,1000
+    python -m benchmarks.run --folder pyauto/auto --axis road_users=1000  # per-frame cost of road users
+    python -m benchmarks.run --folder pyauto/auto --compare benchmarks/results/<other revision>.json
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks import synthetic
+
+BASE_CASE = {"roads": 1, "lanes": 2, "road_users": 10, "misc_objects": 0, "states": 0, "frames": 250,
+             "weather": False}
+AXES = {"road_users": [10, 100, 1000], "misc_objects": [10, 100], "roads": [1, 10, 50], "states": [1, 10],
+        "frames": [100, 1000], "weather": [True]}
+RESULTS_FOLDER = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _parse_value(value: str):
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def _run_case(case: dict, folder: str, cp: bool, options: dict) -> dict:
+    """
+    Converts a synthetic recording with the given parameters, to be executed in a fresh process.
+    """
+    from omega2auto import omega2auto
+    from omega2auto.instrumentation import Instrumentation
+
+    rr = synthetic.make_recording(**case)
+    instr = Instrumentation()
+    start = time.perf_counter()
+    omega2auto._to_auto(rr, folder=folder, cp=cp, instr=instr, **options)
+    elapsed = time.perf_counter() - start
+    scenes = instr.counters.get("scenes", 0)
+    road_users_time = instr.times.get("road_users", 0)
+    individuals = sum(v for k, v in instr.counters.items() if k.startswith("individuals."))
+    return {"case": case, "options": options, "time": elapsed, "scenes": scenes,
+            "scenes_per_second": scenes / elapsed if elapsed > 0 else None,
+            "ms_per_frame": 1000 * elapsed / scenes if scenes > 0 else None,
+            "road_users_ms_per_frame": 1000 * road_users_time / scenes if scenes > 0 else None,
+            "individuals": individuals, "individuals_per_second": individuals / elapsed if elapsed > 0 else None,
+            # ru_maxrss is in kilobytes on Linux
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "instrumentation": instr.summary()}
+
+
+def run(cases: list, folder: str, cp: bool = False, options: dict = None) -> list:
+    """
+    Runs the given benchmark cases, each in a fresh process.
+    :param cases: A list of dictionaries of parameters for synthetic.make_recording(...).
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies.
+    :param options: Additional keyword arguments passed to the converter.
+    :return: The list of results.
+    """
+    results = []
+    for case in cases:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
+            result = executor.submit(_run_case, case, folder, cp, options or {}).result()
+        print("%-70s %8.2fs %8.1f ms/frame (road users: %8.1f ms/frame) %8.1f MB" % (
+            json.dumps(case), result["time"], result["ms_per_frame"] or 0, result["road_users_ms_per_frame"] or 0,
+            result["peak_rss_mb"]))
+        results.append(result)
+    return results
+
+
+def cases_for(axes: dict) -> list:
+    """
+    :return: The base case followed by all cases varying exactly one axis of the base case.
+    """
+    cases = [dict(BASE_CASE)]
+    for axis, values in axes.items():
+        for value in values:
+            case = dict(BASE_CASE)
+            case[axis] = value
+            if case not in cases:
+                cases.append(case)
+    return cases
+
+
+def compare(results: list, other: list):
+    """
+    Prints the relative change of time per frame and peak memory for cases present in both result lists.
+    """
+    others = {json.dumps(r["case"], sort_keys=True): r for r in other}
+    for result in results:
+        key = json.dumps(result["case"], sort_keys=True)
+        if key in others and others[key]["ms_per_frame"] and result["ms_per_frame"]:
+            print("%-70s %+7.1f%% time/frame %+7.1f%% peak memory" % (
+                key, 100 * (result["ms_per_frame"] / others[key]["ms_per_frame"] - 1),
+                100 * (result["peak_rss_mb"] / others[key]["peak_rss_mb"] - 1)))
+
+
+def _revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--folder", default="pyauto/auto", help="folder in which A.U.T.O. is located")
+    parser.add_argument("--cp", action="store_true", help="also load the criticality phenomena ontologies")
+    parser.add_argument("--axis", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="axis to vary (default: a predefined set of axes)")
+    parser.add_argument("--option", action="append", default=[], metavar="NAME=VALUE",
+                        help="keyword argument passed to the converter, e.g. cache_tbox=true")
+    parser.add_argument("--output", help="JSON file to store the results in (default: results/<git revision>.json)")
+    parser.add_argument("--compare", help="JSON file with results of another commit to compare against")
+    args = parser.parse_args(argv)
+
+    axes = AXES
+    if args.axis:
+        axes = {}
+        for axis in args.axis:
+            name, values = axis.split("=", 1)
+            axes[name] = [_parse_value(v) for v in values.split(",")]
+    options = {}
+    for option in args.option:
+        name, value = option.split("=", 1)
+        options[name] = _parse_value(value)
+
+    results = run(cases_for(axes), args.folder, cp=args.cp, options=options)
+
+    output = args.output or os.path.join(RESULTS_FOLDER, _revision() + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"revision": _revision(), "python": sys.version, "results": results}, f, indent=2)
+    print("Stored results in " + output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import numpy as np
+
+import omega_format
+
+
+def _polyline(xs, ys):
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    return omega_format.Polyline(pos_x=xs, pos_y=ys, pos_z=np.zeros(len(xs)))
+
+
+def _road(i: int, lanes: int, lane_length: float, lane_width: float, points: int) -> omega_format.Road:
+    """
+    Creates a straight road at y offset i * (lanes + 1) * lane_width consisting of parallel driving lanes.
+    """
+    road = omega_format.Road(location=omega_format.ReferenceTypes.RoadLocation.URBAN)
+    y0 = i * (lanes + 1) * lane_width
+    xs = np.linspace(0, lane_length, points)
+    borders = [omega_format.Border(polyline=_polyline(xs, np.full(points, y0 + j * lane_width)))
+               for j in range(lanes + 1)]
+    for j, border in enumerate(borders):
+        road.borders[j] = border
+    for j in range(lanes):
+        road.lanes[j] = omega_format.Lane(border_right=omega_format.ReferenceElement(value=borders[j]),
+                                          border_left=omega_format.ReferenceElement(value=borders[j + 1]),
+                                          type=omega_format.ReferenceTypes.LaneType.DRIVING,
+                                          surface=omega_format.ReferenceTypes.SurfaceMaterial.ASPHALT)
+    return road
+
+
+def _road_user(i: int, birth: int, frames: int, y: float, hz: int, rng, misc=False):
+    """
+    Creates a road user (or misc object) driving along the x axis at a random but constant speed.
+    """
+    speed = rng.uniform(0, 15)
+    t = np.arange(frames) / hz
+    tr = omega_format.Trajectory(pos_x=speed * t, pos_y=np.full(frames, y), pos_z=np.zeros(frames),
+                                 heading=np.zeros(frames), roll=np.zeros(frames), pitch=np.zeros(frames),
+                                 vel_longitudinal=np.full(frames, speed), vel_lateral=np.zeros(frames),
+                                 vel_z=np.zeros(frames), acc_longitudinal=np.zeros(frames),
+                                 acc_lateral=np.zeros(frames), acc_z=np.zeros(frames), roll_der=np.zeros(frames),
+                                 pitch_der=np.zeros(frames), heading_der=np.zeros(frames))
+    bb = omega_format.BoundingBox(vec=np.array([4.5, 1.8, 1.5]))
+    if misc:
+        return omega_format.MiscObject(id=i, birth=birth, end=birth + frames - 1, bb=bb, tr=tr,
+                                       type=omega_format.ReferenceTypes.MiscObjectType.ANIMAL)
+    lights = omega_format.VehicleLights(indicator_right=np.zeros(frames), indicator_left=np.zeros(frames),
+                                        brake_lights=(np.arange(frames) // 50) % 2,
+                                        headlights=np.ones(frames), reverseing_lights=np.zeros(frames),
+                                        blue_light=np.full(frames, -1))
+    return omega_format.RoadUser(id=i, birth=birth, end=birth + frames - 1, bb=bb, tr=tr, vehicle_lights=lights,
+                                 type=omega_format.ReferenceTypes.RoadUserType.CAR)
+
+
+def _weather(frames: int, hz: int) -> omega_format.Weather:
+    """
+    Creates weather that changes every ten minutes (as typical for OMEGA weather data).
+    """
+    weather = omega_format.Weather()
+    changes = np.arange(frames) // (10 * 60 * hz)
+    weather.precipitation.type = np.where(changes % 2 == 0, omega_format.ReferenceTypes.Precipitation.NO_RAIN,
+                                          omega_format.ReferenceTypes.Precipitation.LIGHT_RAIN)
+    weather.temperature.air_temp = 15 + changes.astype(float)
+    weather.cloudiness.degree = (changes % 8).astype(float)
+    weather.road_condition.surface_condition = np.full(
+        frames, omega_format.ReferenceTypes.RoadConditionSurfaceCondition.DRY)
+    return weather
+
+
+def make_recording(roads=1, lanes=2, road_users=10, misc_objects=0, states=0, frames=250, weather=False, hz=25,
+                   track_length=None, points=20, seed=0) -> omega_format.ReferenceRecording:
+    """
+    Builds a synthetic OMEGA reference recording in memory.
+    :param roads: The number of (straight, parallel) roads.
+    :param lanes: The number of driving lanes per road.
+    :param road_users: The number of road users, spread uniformly over the recording.
+    :param misc_objects: The number of misc objects, spread uniformly over the recording.
+    :param states: The number of traffic lights with changing states.
+    :param frames: The number of frames of the recording.
+    :param weather: Whether to add weather information.
+    :param hz: The sampling rate of the recording.
+    :param track_length: The number of frames of each road user / misc object track (default: a fifth of the
+        recording).
+    :param points: The number of polyline points per lane border.
+    :param seed: The seed of the random number generator.
+    :return: The reference recording.
+    """
+    rng = np.random.default_rng(seed)
+    lane_width = 3.5
+    lane_length = 200.0
+    if track_length is None:
+        track_length = max(1, frames // 5)
+    track_length = min(track_length, frames)
+
+    rr = omega_format.ReferenceRecording()
+    rr.timestamps = omega_format.Timestamps(val=np.arange(frames) / hz)
+    for i in range(roads):
+        rr.roads[i] = _road(i, lanes, lane_length, lane_width, points)
+    for i in range(road_users):
+        birth = int(rng.integers(0, frames - track_length + 1))
+        y = (rng.integers(0, max(1, roads * lanes)) + 0.5) * lane_width
+        rr.road_users[i] = _road_user(i, birth, track_length, y, hz, rng)
+    for i in range(misc_objects):
+        birth = int(rng.integers(0, frames - track_length + 1))
+        rr.misc_objects[i] = _road_user(i, birth, track_length, -lane_width, hz, rng, misc=True)
+    if roads > 0:
+        for i in range(states):
+            sign = omega_format.Sign(type=omega_format.ReferenceTypes.SignType.TL_REGULAR,
+                                     position=omega_format.Position(pos_x=lane_length, pos_y=i * lane_width, pos_z=0))
+            rr.roads[0].signs[i] = sign
+            # Traffic light cycles of 30s green, 3s amber, 30s red, 2s red-amber
+            cycle = np.arange(frames) / hz % 65
+            value = np.select([cycle < 30, cycle < 33, cycle < 63],
+                              [omega_format.ReferenceTypes.StateValue.GREEN,
+                               omega_format.ReferenceTypes.StateValue.AMBER,
+                               omega_format.ReferenceTypes.StateValue.RED],
+                              omega_format.ReferenceTypes.StateValue.RED_AMBER)
+            rr.states[i] = omega_format.State(sign=sign, value=value)
+    if weather:
+        rr.weather = _weather(frames, hz)
+    return rr
+
@@ -0,0 +1,72 @@
+import bisect
+
+import numpy as np
+
+
+class ActivityIndex:
+    """
+    Index over the lifetimes (birth and end frame, both inclusive) of a collection of OMEGA objects, e.g. road users or
+    misc objects, that is built once per snippet. Replaces linear filtering of all objects in every frame.
+    """
+
+    def __init__(self, objects: dict):
+        """
+        Builds the index.
+        :param objects: A dictionary from identifiers to OMEGA objects having a birth and an end attribute.
+        """
+        self._keys = list(objects.keys())
+        self._objects = list(objects.values())
+        self._births = np.array([o.birth for o in self._objects], dtype=np.int64)
+        self._ends = np.array([o.end for o in self._objects], dtype=np.int64)
+        self._by_birth = np.argsort(self._births, kind="stable")
+        self._by_end = np.argsort(self._ends, kind="stable")
+        self._sorted_births = self._births[self._by_birth]
+        self._sorted_ends = self._ends[self._by_end]
+
+    def __len__(self):
+        return len(self._objects)
+
+    def _items(self, indices) -> list:
+        return [(self._keys[i], self._objects[i]) for i in indices]
+
+    def active_at(self, frame: int) -> list:
+        """
+        Returns all objects that are active in the given frame, i.e. birth <= frame <= end.
+        :param frame: The frame number.
+        :return: A list of (identifier, object) tuples in the order of the dictionary the index was built from.
+        """
+        candidates = self._by_birth[:np.searchsorted(self._sorted_births, frame, side="right")]
+        return self._items(np.sort(candidates[self._ends[candidates] >= frame]))
+
+    def sweep(self, frames):
+        """
+        Sweep-line iteration over the given, monotonically increasing frames. Keeps the set of active objects up to date
+        by only processing the objects entering or leaving between two consecutive frames, such that each step costs
+        O(log n + k) for k changes instead of O(n).
+        :param frames: An iterable of monotonically increasing frame numbers.
+        :return: A generator yielding tuples (frame, entered, left, active) where entered and left are the lists of
+            (identifier, object) tuples that became active or inactive since the previous frame and active is the list
+            of all (identifier, object) tuples active in the frame, in the order of the dictionary the index was built
+            from.
+        """
+        active = []
+        active_set = set()
+        next_birth = 0
+        next_end = 0
+        for frame in frames:
+            frame = int(frame)
+            # Active objects that ended before this frame leave the active set
+            last_end = int(np.searchsorted(self._sorted_ends, frame, side="left"))
+            left = [int(i) for i in self._by_end[next_end:last_end] if int(i) in active_set]
+            next_end = last_end
+            for i in left:
+                del active[bisect.bisect_left(active, i)]
+                active_set.remove(i)
+            # Objects that were born up to this frame enter the active set (unless they already ended again)
+            last_birth = int(np.searchsorted(self._sorted_births, frame, side="right"))
+            entered = [int(i) for i in self._by_birth[next_birth:last_birth] if self._ends[i] >= frame]
+            next_birth = last_birth
+            for i in entered:
+                bisect.insort(active, i)
+                active_set.add(i)
+            yield frame, self._items(entered), self._items(left), self._items(active)
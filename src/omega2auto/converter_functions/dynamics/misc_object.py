@@ -5,8 +5,7 @@ from ..utils import *
 def to_auto(cls, scene: Scene, scene_number: int, identifier=None):
     s = scene_number - cls.birth
     mo = scene.ontology(auto.Ontology.Physics).Spatial_Object()
-    mo.identifier = identifier
-    mo.identifier = cls.id
+    set_data_property(mo, "identifier", cls.id)
     # Store type and sub_type
     # We ignore 'misc' type and do not set any specific subclass (open world assumption)
     l4_de = scene.ontology(auto.Ontology.L4_DE)
@@ -1,104 +1,216 @@
-import math
-
 import owlready2
 
 from ..utils import *
 
 
-@monkeypatch(omega_format.RoadUser)
-def to_auto(cls, scene: Scene, scene_number: int, identifier=None):
-    s = scene_number - cls.birth
+def _get_standing_off_lane(cls, index: DriveableLanesIndex, length: float, width: float, height: float):
+    """
+    Classifies for each frame of the road user's trajectory whether it is standing still while its bounding box is not
+    completely within a driveable lane. Computed once for the whole trajectory and cached on the road user.
+    :param cls: The OMEGA road user.
+    :param index: The index of the driveable lanes of the scenery.
+    :param length: The length of the bounding box.
+    :param width: The width of the bounding box.
+    :param height: The height of the bounding box.
+    :return: A NumPy array of booleans, one per frame.
+    """
+    key = (index, length, width, height)
+    if getattr(cls, "standing_off_lane_key", None) != key:
+        speed = np.sqrt(np.asarray(cls.tr.vel_longitudinal, dtype=float) ** 2 +
+                        np.asarray(cls.tr.vel_lateral, dtype=float) ** 2 + np.asarray(cls.tr.vel_z, dtype=float) ** 2)
+        standing = speed == 0
+        geometries, _ = get_trajectory_geometries(cls, length, width, height)
+        standing_off_lane = np.zeros(len(standing), dtype=bool)
+        standing_off_lane[standing] = ~index.contains(geometries[standing])
+        cls.standing_off_lane = standing_off_lane
+        cls.standing_off_lane_key = key
+    return cls.standing_off_lane
+
+
+# Vehicle lights as tuples of the attribute of OMEGA's vehicle lights and the name of the lamp class in L4_DE
+_LIGHTS = [("indicator_right", "Indicator_Light_Right"), ("indicator_left", "Indicator_Light_Left"),
+           ("brake_lights", "Brake_Light"), ("headlights", "Headlight"), ("reverseing_lights", "Reversing_Light"),
+           ("blue_light", "Emergency_Light")]
+
+
+class ConversionPlan:
+    """
+    Static classification of a road user (which does not change over the lifetime of its track), resolved once at the
+    birth of the track and replayed in every frame. OWL classes are stored as tuples of ontology and class name since
+    each scene is a world of its own.
+    """
+
+    __slots__ = ("vehicle_classes", "road_user_classes", "drives_something", "traffic_object", "needs_vehicle",
+                 "light_channels", "light_states")
+
+    def __init__(self, cls):
+        ru_type = cls.type
+        sub_type = cls.sub_type
+        types = omega_format.ReferenceTypes
+        l4_core = auto.Ontology.L4_Core
+        l4_de = auto.Ontology.L4_DE
+
+        # Vehicle type
+        self.drives_something = True
+        self.vehicle_classes = []
+        if ru_type == types.RoadUserType.CAR:
+            self.vehicle_classes.append((l4_de, "Passenger_Car"))
+        elif ru_type == types.RoadUserType.TRUCK:
+            self.vehicle_classes.append((l4_de, "Truck"))
+            if sub_type == types.RoadUserSubTypeTRUCK.STREET_CLEANING:
+                self.vehicle_classes.append((l4_de, "Street_Cleaning_Truck"))
+        elif ru_type == types.RoadUserType.BUS:
+            self.vehicle_classes.append((l4_de, "Bus"))
+            if sub_type == types.RoadUserSubTypeBUS.BENDY_BUS:
+                self.vehicle_classes.append((l4_de, "Bendy_Bus"))
+            elif sub_type == types.RoadUserSubTypeBUS.TROLLEY_BUS:
+                self.vehicle_classes.append((l4_de, "Trolleybus"))
+        elif ru_type == types.RoadUserType.MOTORCYCLE:
+            self.vehicle_classes.append((l4_de, "Motorcycle"))
+        elif ru_type == types.RoadUserType.BICYCLE:
+            self.vehicle_classes.append((l4_de, "Bicycle"))
+        elif ru_type == types.RoadUserType.WHEELCHAIR:
+            self.vehicle_classes.append((l4_de, "Wheelchair"))
+        elif ru_type == types.RoadUserType.PERSONAL_MOBILITY_DEVICE:
+            self.vehicle_classes.append((l4_de, "Personal_Mobility_Device"))
+        elif ru_type == types.RoadUserType.TRAILER:
+            self.vehicle_classes.append((l4_de, "Trailer"))
+            if sub_type == types.RoadUserSubTypeTRAILER.CAR_TRAILER:
+                self.vehicle_classes.append((l4_de, "Passenger_Vehicle_Trailer"))
+            elif sub_type == types.RoadUserSubTypeTRAILER.CARAVAN:
+                self.vehicle_classes.append((l4_de, "Caravan"))
+            elif sub_type == types.RoadUserSubTypeTRAILER.TRUCK_TRAILER:
+                self.vehicle_classes.append((l4_de, "Truck_Trailer"))
+            elif sub_type == types.RoadUserSubTypeTRAILER.TRAIN_TRAILER:
+                self.vehicle_classes.append((l4_de, "Train_Trailer"))
+            elif sub_type == types.RoadUserSubTypeTRAILER.BENDY_BUS_TRAILER:
+                self.vehicle_classes.append((l4_de, "Bendy_Bus_Trailer"))
+        elif ru_type == types.RoadUserType.FARMING:
+            self.vehicle_classes.append((l4_de, "Farming_Vehicle"))
+        elif ru_type == types.RoadUserType.RAIL:
+            self.vehicle_classes.append((l4_de, "Rail_Vehicle"))
+        elif ru_type == types.RoadUserType.CARRIAGE:
+            self.vehicle_classes.append((l4_de, "Carriage"))
+        else:
+            self.drives_something = False
+        # Subtypes
+        if sub_type == types.RoadUserSubTypeGeneral.EMERGENCY:
+            self.vehicle_classes.append((l4_de, "Emergency_Vehicle"))
+        if sub_type == types.RoadUserSubTypeGeneral.CONSTRUCTION:
+            self.vehicle_classes.append((l4_de, "Construction_Vehicle"))
+
+        # Road user individual
+        if sub_type == types.RoadUserSubTypeMOTORCYCLE.WITHOUT_RIDER or \
+                sub_type == types.RoadUserSubTypeBICYCLE.WITHOUT_RIDER or \
+                sub_type == types.RoadUserSubTypeWHEELCHAIR.WITHOUT_RIDER or \
+                sub_type == types.RoadUserSubTypePERSONAL_MOBILITY_DEVICE.WITHOUT_RIDER:
+            self.road_user_classes = [(l4_core, "Traffic_Object")]
+            self.traffic_object = True
+        else:
+            self.road_user_classes = [(l4_core, "Human"), (auto.Ontology.Perception, "Observer")]
+            self.traffic_object = False
+
+        # Road user type
+        if ru_type == types.RoadUserType.PEDESTRIAN:
+            self.road_user_classes.append((l4_core, "Pedestrian"))
+            if sub_type == types.RoadUserSubTypePEDESTRIAN.CHILD:
+                self.road_user_classes.append((l4_de, "Child"))
+            elif sub_type == types.RoadUserSubTypePEDESTRIAN.ADULT:
+                self.road_user_classes.append((l4_de, "Adult"))
+        elif ru_type == types.RoadUserType.REGULAR:
+            self.road_user_classes.append((l4_core, "Traffic_Subject"))
+        if ru_type == types.RoadUserSubTypeGeneral.CONSTRUCTION:
+            self.road_user_classes.append((l4_de, "Road_Worker"))
+
+        # Driven objects get an individual of their own as physical representation
+        self.needs_vehicle = self.drives_something and not self.traffic_object
+
+        # Vehicle lights that are recorded at all
+        self.light_channels = [(attribute, lamp) for attribute, lamp in _LIGHTS
+                               if len(getattr(cls.vehicle_lights, attribute)) > 0]
+        self.light_states = _decode_light_states(cls, self.light_channels)
 
-    # Fetches ontologies
-    pe = scene.ontology(auto.Ontology.Perception)
-    ph = scene.ontology(auto.Ontology.Physics)
-    geo = scene.ontology(auto.Ontology.GeoSPARQL)
-    l4_core = scene.ontology(auto.Ontology.L4_Core)
-    l4_de = scene.ontology(auto.Ontology.L4_DE)
-
-    # Creates vehicle, if given
-    drives_something = True
-    is_a = []
-    if cls.type == omega_format.ReferenceTypes.RoadUserType.CAR:
-        is_a = l4_de.Passenger_Car
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.TRUCK:
-        is_a = l4_de.Truck
-        if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeTRUCK.STREET_CLEANING:
-            is_a.append(l4_de.Street_Cleaning_Truck)
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.BUS:
-        is_a = l4_de.Bus
-        if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeBUS.BENDY_BUS:
-            is_a.append(l4_de.Bendy_Bus)
-        elif cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeBUS.TROLLEY_BUS:
-            is_a.append(l4_de.Trolleybus)
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.MOTORCYCLE:
-        is_a = l4_de.Motorcycle
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.BICYCLE:
-        is_a = l4_de.Bicycle
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.WHEELCHAIR:
-        is_a = l4_de.Wheelchair
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.PERSONAL_MOBILITY_DEVICE:
-        is_a = l4_de.Personal_Mobility_Device
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.TRAILER:
-        is_a = l4_de.Trailer
-        if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeTRAILER.CAR_TRAILER:
-            is_a.append(l4_de.Passenger_Vehicle_Trailer)
-        elif cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeTRAILER.CARAVAN:
-            is_a.append(l4_de.Caravan)
-        elif cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeTRAILER.TRUCK_TRAILER:
-            is_a.append(l4_de.Truck_Trailer)
-        elif cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeTRAILER.TRAIN_TRAILER:
-            is_a.append(l4_de.Train_Trailer)
-        elif cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeTRAILER.BENDY_BUS_TRAILER:
-            is_a.append(l4_de.Bendy_Bus_Trailer)
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.FARMING:
-        is_a = l4_de.Farming_Vehicle
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.RAIL:
-        is_a = l4_de.Rail_Vehicle
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.CARRIAGE:
-        is_a = l4_de.Carriage
+
+def _decode_light_states(cls, light_channels: list) -> np.ndarray:
+    """
+    Decodes the recorded vehicle lights of the road user into a matrix of states with one row per frame of the track and
+    one column per light channel. Frames for which a light is not recorded are set to -1 (unknown).
+    :param cls: The OMEGA road user.
+    :param light_channels: The list of tuples of attribute names of the vehicle lights and lamp class names.
+    :return: A NumPy array of shape (frames, channels).
+    """
+    values = [np.asarray(getattr(cls.vehicle_lights, attribute)) for attribute, _ in light_channels]
+    states = np.full((max((len(v) for v in values), default=0), len(values)), -1, dtype=np.int16)
+    for channel, v in enumerate(values):
+        states[:len(v), channel] = v
+    return states
+
+
+def _get_changed_lights(cls, plan: ConversionPlan, s: int) -> np.ndarray:
+    """
+    Returns for each light channel whether its state in frame s of the track differs from its state in the previously
+    converted frame. All channels are considered changed in the first converted frame of the track.
+    :param cls: The OMEGA road user.
+    :param plan: The conversion plan of the road user.
+    :param s: The frame within the track (which has to be within the decoded light states).
+    """
+    last_s = getattr(cls, "last_light_frame", None)
+    if last_s is None or last_s >= s:
+        changed = np.ones(len(plan.light_channels), dtype=bool)
     else:
-        drives_something = False
-    # Subtypes
-    if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeGeneral.EMERGENCY:
-        is_a.append(l4_de.Emergency_Vehicle)
-    if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeGeneral.CONSTRUCTION:
-        is_a.append(l4_de.Construction_Vehicle)
+        changed = plan.light_states[s] != plan.light_states[last_s]
+    cls.last_light_frame = s
+    return changed
+
+
+def set_last_light_frame(cls, scene_number: int):
+    """
+    Records the given frame as the previously converted frame of the road user's lights (see lights_on_change of
+    to_auto(...)), as if it had been converted, e.g. when continuing a conversion started by another process.
+    :param cls: The OMEGA road user.
+    :param scene_number: The number of the frame within the recording.
+    """
+    s = scene_number - cls.birth
+    if cls.birth <= scene_number <= cls.end and s < len(get_conversion_plan(cls).light_states):
+        cls.last_light_frame = s
+
+
+def get_conversion_plan(cls) -> ConversionPlan:
+    """
+    Returns the conversion plan of the given road user, creates it on first use (i.e. at the birth of the track).
+    :param cls: The OMEGA road user.
+    """
+    if getattr(cls, "conversion_plan", None) is None:
+        cls.conversion_plan = ConversionPlan(cls)
+    return cls.conversion_plan
+
+
+@monkeypatch(omega_format.RoadUser)
+def to_auto(cls, scene: Scene, scene_number: int, identifier=None, lights_on_change=False):
+    """
+    Converts the road user in the given frame.
+    :param scene: The scene to convert into.
+    :param scene_number: The number of the frame within the recording.
+    :param identifier: The identifier of the road user.
+    :param lights_on_change: If True, lamp individuals are only created in scenes in which the state of the respective
+        light has changed since the previously converted scene (and in the first scene of the track).
+    """
+    s = scene_number - cls.birth
+    plan = get_conversion_plan(cls)
 
     # Creates road user instance
-    if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeMOTORCYCLE.WITHOUT_RIDER or \
-            cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeBICYCLE.WITHOUT_RIDER or \
-            cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypeWHEELCHAIR.WITHOUT_RIDER or \
-            cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypePERSONAL_MOBILITY_DEVICE.WITHOUT_RIDER:
-        ru = l4_core.Traffic_Object()
-        traffic_object = True
-    else:
-        ru = l4_core.Human()
-        ru.is_a.append(pe.Observer)
-        traffic_object = False
-
-    # Stores road user type
-    if cls.type == omega_format.ReferenceTypes.RoadUserType.PEDESTRIAN:
-        ru.is_a.append(l4_core.Pedestrian)
-        if cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypePEDESTRIAN.CHILD:
-            ru.is_a.append(l4_de.Child)
-        elif cls.sub_type == omega_format.ReferenceTypes.RoadUserSubTypePEDESTRIAN.ADULT:
-            ru.is_a.append(l4_de.Adult)
-    elif cls.type == omega_format.ReferenceTypes.RoadUserType.REGULAR:
-        ru.is_a.append(l4_core.Traffic_Subject)
-    if len(ru.is_a) > 0 and cls.type == omega_format.ReferenceTypes.RoadUserSubTypeGeneral.CONSTRUCTION:
-        ru.is_a.append(l4_de.Road_Worker)
+    road_user_classes = [get_class(scene, ontology, name) for ontology, name in plan.road_user_classes]
+    ru = road_user_classes[0]()
+    ru.is_a.extend(road_user_classes[1:])
 
     # Decide which individual is the physical representation (driven objects vs. non-driven objects)
-    if drives_something and not traffic_object:
-        veh = l4_core.Vehicle()
-        veh.is_a.append(is_a)
+    if plan.needs_vehicle:
+        veh = get_class(scene, auto.Ontology.L4_Core, "Vehicle")()
+        veh.is_a.extend([get_class(scene, ontology, name) for ontology, name in plan.vehicle_classes])
         ru.drives = [veh]
         phys_repr = veh
         # Vehicle will get its own geometrical properties later, store those for the driver now.
-        ru_geometry = geo.Geometry()
-        ru_geometry.asWKT = [geometry.Point(cls.tr.pos_x[s], cls.tr.pos_y[s], cls.tr.pos_z[s]).wkt]
-        ru.hasGeometry = [ru_geometry]
+        ru.hasGeometry = [add_wkt_geometry(shapely.points(polyline_coordinates(cls.tr, s, s + 1)[0]), scene)]
     else:
         # If no vehicle is given, the road user itself is the physical representation (e.g. a pedestrian).
         phys_repr = ru
@@ -115,62 +227,29 @@ def to_auto(cls, scene: Scene, scene_number: int, identifier=None):
 
     # Check for parking / standing vehicles on not intersecting a drivable lane completely, for which we do not assume
     # a driver to be present
-    lanes_geom = scene._scenery.get_all_driveable_lanes_geometry()
-    is_parking_vehicle = (math.isclose(math.sqrt(cls.tr.vel_longitudinal[s]**2 + cls.tr.vel_lateral[s]**2 +
-                                                 cls.tr.vel_z[s]**2), 0)
-                          and not lanes_geom.contains(wkt.loads(phys_repr.hasGeometry[0].asWKT[0])))
-    if drives_something and not traffic_object and is_parking_vehicle:
+    if plan.needs_vehicle and _get_standing_off_lane(cls, get_driveable_lanes_index(scene._scenery),
+                                                     *get_bounding_box(cls))[s]:
         owlready2.destroy_entity(ru)
         ru = phys_repr
 
     # Store vehicle lights
-    if len(cls.vehicle_lights.indicator_right) > s and cls.vehicle_lights.indicator_right[s] != -1:
-        light = l4_de.Indicator_Light_Right()
-        if cls.vehicle_lights.indicator_right[s] == 0:
-            light.is_a.append(ph.Inactive_Lamp)
-        elif cls.vehicle_lights.indicator_right[s] == 1:
-            light.is_a.append(ph.Active_Lamp)
-        phys_repr.has_part.append(light)
-    if len(cls.vehicle_lights.indicator_left) > s and cls.vehicle_lights.indicator_left[s] != -1:
-        light = l4_de.Indicator_Light_Left()
-        if cls.vehicle_lights.indicator_left[s] == 0:
-            light.is_a.append(ph.Inactive_Lamp)
-        elif cls.vehicle_lights.indicator_left[s] == 1:
-            light.is_a.append(ph.Active_Lamp)
-        phys_repr.has_part.append(light)
-    if len(cls.vehicle_lights.brake_lights) > s and cls.vehicle_lights.brake_lights[s] != -1:
-        light = l4_de.Brake_Light()
-        if cls.vehicle_lights.brake_lights[s] == 0:
-            light.is_a.append(ph.Inactive_Lamp)
-        elif cls.vehicle_lights.brake_lights[s] == 1:
-            light.is_a.append(ph.Active_Lamp)
-        phys_repr.has_part.append(light)
-    if len(cls.vehicle_lights.headlights) > s and cls.vehicle_lights.headlights[s] != -1:
-        light = l4_de.Headlight()
-        if cls.vehicle_lights.headlights[s] == 0:
-            light.is_a.append(ph.Inactive_Lamp)
-        elif cls.vehicle_lights.headlights[s] == 1:
-            light.is_a.append(ph.Active_Lamp)
-        phys_repr.has_part.append(light)
-    if len(cls.vehicle_lights.reverseing_lights) > s and cls.vehicle_lights.reverseing_lights[s] != -1:
-        light = l4_de.Reversing_Light()
-        if cls.vehicle_lights.reverseing_lights[s] == 0:
-            light.is_a.append(ph.Inactive_Lamp)
-        elif cls.vehicle_lights.reverseing_lights[s] == 1:
-            light.is_a.append(ph.Active_Lamp)
-        phys_repr.has_part.append(light)
-    if len(cls.vehicle_lights.blue_light) > s and cls.vehicle_lights.blue_light[s] != -1:
-        light = l4_de.Emergency_Light()
-        if cls.vehicle_lights.blue_light[s] == 0:
-            light.is_a.append(ph.Inactive_Lamp)
-        elif cls.vehicle_lights.blue_light[s] == 1:
-            light.is_a.append(ph.Active_Lamp)
-        phys_repr.has_part.append(light)
-    ru.identifier = identifier
+    if s < len(plan.light_states):
+        emit = plan.light_states[s] != -1
+        if lights_on_change:
+            emit &= _get_changed_lights(cls, plan, s)
+        for channel in np.flatnonzero(emit):
+            state = plan.light_states[s, channel]
+            light = get_class(scene, auto.Ontology.L4_DE, plan.light_channels[channel][1])()
+            if state == 0:
+                light.is_a.append(get_class(scene, auto.Ontology.Physics, "Inactive_Lamp"))
+            elif state == 1:
+                light.is_a.append(get_class(scene, auto.Ontology.Physics, "Active_Lamp"))
+            phys_repr.has_part.append(light)
+    set_data_property(ru, "identifier", identifier)
 
     # Map RR instance to one or two OWL individuals
     if phys_repr is ru:
         return [(cls, [ru])]
     else:
-        phys_repr.identifier = "repr" + str(identifier)
+        set_data_property(phys_repr, "identifier", "repr" + str(identifier))
         return [(cls, [ru, phys_repr])]
@@ -136,25 +136,15 @@ def to_auto(cls, scenery: Scenery, lane, identifier=None, parent_identifier=None
             line = lane.border_right.value.polyline
         else:
             line = lane.border_left.value.polyline
+        coordinates = polyline_coordinates(line, cls.poly_index_start, cls.poly_index_end + 1)
         if not boundary.has_height or boundary.has_height == 0:
-            wkt_string = "LINESTRING ( "
-            for i in range(cls.poly_index_start, min(len(line.pos_x), cls.poly_index_end + 1)):
-                wkt_string += str(line.pos_x[i]) + " " + str(line.pos_y[i]) + " " + str(line.pos_z[i]) + ", "
-            wkt_string = wkt_string[:-2] + " )"
+            geom = shapely.linestrings(coordinates)
         else:
-            wkt_string = "POLYGON (( "
-            for i in range(cls.poly_index_start, min(len(line.pos_x), cls.poly_index_end + 1)):
-                wkt_string += str(line.pos_x[i]) + " " + str(line.pos_y[i]) + " " + str(line.pos_z[i]) + ", "
-            for i in range(min(len(line.pos_x) - 1, cls.poly_index_end), cls.poly_index_start - 1, -1):
-                wkt_string += str(line.pos_x[i]) + " " + str(line.pos_y[i]) + " " + str(boundary.has_height) + ", "
-            wkt_string += str(line.pos_x[cls.poly_index_start]) + " " + str(line.pos_y[cls.poly_index_start]) + " " + \
-                          str(line.pos_z[cls.poly_index_start]) + ", "
-            wkt_string = wkt_string[:-2] + " ))"
-        geom = wkt.loads(wkt_string)
+            top = polyline_coordinates(line, cls.poly_index_start, cls.poly_index_end + 1, z=boundary.has_height)
+            geom = shapely.polygons(np.concatenate([coordinates, top[::-1], coordinates[:1]]))
         if boundary.has_width and boundary.has_width > 0:
             geom = geom.buffer(boundary.has_width, cap_style=2)
-        bound_geo = geo.Geometry()
-        bound_geo.asWKT = [str(geom)]
+        bound_geo = add_wkt_geometry(geom, scenery)
         if not boundary_system:
             boundary.hasGeometry = [bound_geo]
         else:
@@ -6,7 +6,6 @@ def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None):
 
     # Fetches ontologies
     ph = scenery.ontology(auto.Ontology.Physics)
-    geo = scenery.ontology(auto.Ontology.GeoSPARQL)
     l1_core = scenery.ontology(auto.Ontology.L1_Core)
     l1_de = scenery.ontology(auto.Ontology.L1_DE)
 
@@ -20,17 +19,12 @@ def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None):
 
     # Stores geometry (can only be 1 or 2 points according to OMEGA specification)
     if 0 < len(cls.polyline.pos_x) < 3:
-        if len(cls.polyline.pos_x) == 1:
-            wkt_string = "POINT ( " + str(cls.polyline.pos_x[0]) + " " + str(cls.polyline.pos_y[0]) + " " + \
-                         str(cls.polyline.pos_z[0]) + ")"
-        elif len(cls.polyline.pos_x) == 2:
-            wkt_string = "LINESTRING ( " + str(cls.polyline.pos_x[0]) + " " + str(cls.polyline.pos_y[0]) + " " + \
-                         str(cls.polyline.pos_z[0]) + ", " + str(cls.polyline.pos_x[1]) + " " + \
-                         str(cls.polyline.pos_y[1]) + " " + str(cls.polyline.pos_z[1]) + " )"
-        geom = wkt.loads(wkt_string)
-        marker_geom = geo.Geometry()
-        marker_geom.asWKT = [str(geom)]
-        marker.hasGeometry = [marker_geom]
+        coordinates = polyline_coordinates(cls.polyline)
+        if len(coordinates) == 1:
+            geom = shapely.points(coordinates[0])
+        else:
+            geom = shapely.linestrings(coordinates)
+        marker.hasGeometry = [add_wkt_geometry(geom, scenery)]
 
     # Stores marker color
     if cls.color == omega_format.ReferenceTypes.FlatMarkingColor.RED:
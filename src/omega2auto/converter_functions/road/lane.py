@@ -6,7 +6,6 @@ def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None):
     # Note: classification and sub_type are ignored as this can be easily inferred by spatial properties
 
     # Fetches ontologies
-    geo = scenery.ontology(auto.Ontology.GeoSPARQL)
     l1_core = scenery.ontology(auto.Ontology.L1_Core)
     l1_de = scenery.ontology(auto.Ontology.L1_DE)
     l2_core = scenery.ontology(auto.Ontology.L2_Core)
@@ -15,33 +14,17 @@ def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None):
     lane = l1_core.Lane()
     lane.identifier = str(parent_identifier) + "_" + str(identifier)
 
-    # Stores geometrical properties
-    poly_left = cls.border_left.value.polyline
-    poly_right = cls.border_right.value.polyline
-    wkt_string = "POLYGON (("
-    if not cls.border_left_is_inverted:
-        left_iter = range(len(poly_left.pos_x))
-    else:
-        left_iter = reversed(range(len(poly_left.pos_x)))
-    for i in left_iter:
-        wkt_string += str(poly_left.pos_x[i]) + " " + str(poly_left.pos_y[i]) + " " + str(poly_left.pos_z[i]) + ", "
+    # Stores geometrical properties (left border forwards, right border backwards)
+    left = polyline_coordinates(cls.border_left.value.polyline)
+    right = polyline_coordinates(cls.border_right.value.polyline)
+    if cls.border_left_is_inverted:
+        left = left[::-1]
     if not cls.border_right_is_inverted:
-        right_iter = reversed(range(len(poly_right.pos_x)))
-    else:
-        right_iter = range(len(poly_right.pos_x))
-    for i in right_iter:
-        wkt_string += str(poly_right.pos_x[i]) + " " + str(poly_right.pos_y[i]) + " " + str(poly_right.pos_z[i]) + \
-                      ", "
-    if not cls.border_left_is_inverted:
-        start_point = 0
-    else:
-        start_point = -1
-    wkt_string += str(poly_left.pos_x[start_point]) + " " + str(poly_left.pos_y[start_point]) + " " + \
-                  str(poly_left.pos_z[start_point]) + "))"
-    geom = wkt.loads(wkt_string)
-    lane_geometry = geo.Geometry()
-    lane_geometry.asWKT = [str(geom)]
-    lane.hasGeometry = [lane_geometry]
+        right = right[::-1]
+    geom = shapely.polygons(np.concatenate([left, right, left[:1]]))
+    # Kept in memory for computing the road's footprint without parsing the WKT again
+    cls.owl_geometry = geom
+    lane.hasGeometry = [add_wkt_geometry(geom, scenery)]
 
     # Stores lane type
     if cls.type == omega_format.ReferenceTypes.LaneType.BUS_LANE:
@@ -2,8 +2,35 @@ import omega_format
 from ..utils import *
 
 
+# Wiggle room (in m) when clipping lateral markings to their parent geometry
+_CLIP_TOLERANCE = 0.3
+
+
+def get_clip_geometry(parent_geometry):
+    """
+    Computes the geometry lateral markings are clipped to, i.e. the prepared parent geometry buffered by the clipping
+    tolerance. Meant to be computed once per parent (e.g. road) and passed to all of its lateral markings.
+    :param parent_geometry: The shapely geometry of the parent, e.g. the road footprint.
+    :return: The prepared, buffered shapely geometry or None if no parent geometry is given.
+    """
+    if not parent_geometry:
+        return None
+    clip_geometry = parent_geometry.buffer(_CLIP_TOLERANCE)
+    shapely.prepare(clip_geometry)
+    return clip_geometry
+
+
 @monkeypatch(omega_format.LateralMarking)
-def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None, parent_geometry=None):
+def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None, parent_geometry=None,
+            clip_geometry=None):
+    """
+    Converts the lateral marking into the scenery.
+    :param identifier: The identifier of the marking.
+    :param parent_identifier: The identifier of the parent, e.g. of the road.
+    :param parent_geometry: The shapely geometry of the parent to clip the marking to (e.g. for pedestrian crossings).
+    :param clip_geometry: The geometry to clip to as precomputed by get_clip_geometry(parent_geometry). If given,
+        parent_geometry is ignored.
+    """
 
     # Fetches ontologies
     ph = scenery.ontology(auto.Ontology.Physics)
@@ -63,21 +90,15 @@ def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None, pare
         add_relation(marker, "applies_to", lane)
 
     # Geometry
-    wkt_string = "LINESTRING ( "
-    for i in range(0, len(cls.polyline.pos_x)):
-        wkt_string += str(cls.polyline.pos_x[i]) + " " + str(cls.polyline.pos_y[i]) + " " + \
-                      str(cls.polyline.pos_z[i]) + ", "
-    wkt_string = wkt_string[:-2] + " )"
-    geom = wkt.loads(wkt_string)
+    geom = shapely.linestrings(polyline_coordinates(cls.polyline))
     geom = geom.buffer(float(cls.long_size / 2), cap_style=2)
-    if parent_geometry:
-        # allowing 30cm of wiggle room here
-        intersection = geom.intersection(parent_geometry.buffer(0.3))
-        # only cut to parent geometry (e.g. for pedestrian crossings) if the result is not empty
-        if not intersection.is_empty:
-            geom = intersection
-    mark_geom = geo.Geometry()
-    mark_geom.asWKT = [str(geom)]
+    if clip_geometry is None:
+        clip_geometry = get_clip_geometry(parent_geometry)
+    # only cut to parent geometry (e.g. for pedestrian crossings) if the result is neither empty nor the marking itself
+    if clip_geometry is not None and shapely.intersects(clip_geometry, geom) and \
+            not shapely.contains(clip_geometry, geom):
+        geom = geom.intersection(clip_geometry)
+    mark_geom = add_wkt_geometry(geom, scenery)
     # Case 1: Standard lateral marker
     if not reflector_system:
         # Width
@@ -1,11 +1,26 @@
 from ..utils import *
+from .lateral_marking import get_clip_geometry
+
+
+def get_road_geometry(lane_geoms: list):
+    """
+    Computes the footprint of a road as the union of its lane polygons. Invalid (e.g. self-intersecting) lane polygons
+    are repaired beforehand, as the union can not handle them.
+    :param lane_geoms: The list of lane polygons.
+    :return: The union of the (repaired) lane polygons.
+    """
+    geoms = np.asarray(lane_geoms, dtype=object)
+    invalid = ~shapely.is_valid(geoms)
+    if np.any(invalid):
+        logger.debug("Repairing %d invalid lane geometries", np.count_nonzero(invalid))
+        geoms[invalid] = shapely.make_valid(geoms[invalid])
+    return shapely.union_all(geoms)
 
 
 @monkeypatch(omega_format.Road)
 def to_auto(cls, scenery: Scenery, identifier=None):
 
     # Fetches ontologies
-    geo = scenery.ontology(auto.Ontology.GeoSPARQL)
     l1_core = scenery.ontology(auto.Ontology.L1_Core)
     l1_de = scenery.ontology(auto.Ontology.L1_DE)
 
@@ -26,33 +41,28 @@ def to_auto(cls, scenery: Scenery, identifier=None):
     # Creates lane instances
     road_geom = None
     if len(cls.lanes.values()) > 0:
-        wkt_string = "MULTIPOLYGON ("
-        lane_instances = []
+        lane_geoms = []
         for i, lane in enumerate(cls.lanes.values()):
             lane_insts = lane.to_auto(scenery, i, parent_id + "_0")
             instances += lane_insts
             lane_inst = lane_insts[0][1][0]
-            lane_instances.append((lane, [lane_inst]))
             road.has_lane.append(lane_inst)
             lane_inst.has_road = road
-            wkt_string += lane_inst.hasGeometry[0].asWKT[0].replace("POLYGON ", "") + ", "
+            lane_geoms.append(lane.owl_geometry)
+            if is_driveable_lane(scenery, lane_inst):
+                add_driveable_lane_geometry(scenery, lane.owl_geometry)
             road.has_road_material += lane_inst.has_lane_material
 
-        # Stores geometry of road as conjunction of lane polygons
-        wkt_string = wkt_string[:-2] + "))"
-        road_geom = wkt.loads(wkt_string)
-        # Fix invalid roads (multipolygon may intersect itself due to taking the union of all lanes)
-        if not road_geom.is_valid:
-            road_geom = road_geom.buffer(0)
-        road_geometry = geo.Geometry()
-        road_geometry.asWKT = [str(road_geom)]
-        road.hasGeometry = [road_geometry]
+        # Stores geometry of road as union of lane polygons
+        road_geom = get_road_geometry(lane_geoms)
+        road.hasGeometry = [add_wkt_geometry(road_geom, scenery)]
     else:
         logger.warning("Found a road with no lane instances")
 
-    # Add lateral markers
+    # Add lateral markers (clipped to the road footprint, which is buffered and prepared only once per road)
+    clip_geom = get_clip_geometry(road_geom) if len(cls.lateral_markings.data) > 0 else None
     for i, marker in enumerate(cls.lateral_markings.data.values()):
-        marker_inst = marker.to_auto(scenery, i, parent_id + "_1", road_geom)
+        marker_inst = marker.to_auto(scenery, i, parent_id + "_1", road_geom, clip_geometry=clip_geom)
         marker_inst[0][1][0].applies_to.append(road)
         instances += marker_inst
 
@@ -72,4 +82,5 @@ def to_auto(cls, scenery: Scenery, identifier=None):
         instances += sign_inst
 
     instances.append((cls, [road]))
+    index_scenery_individuals(scenery, instances)
     return instances
@@ -5,7 +5,6 @@ from ..utils import *
 def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None):
 
     # Fetches ontologies
-    geo = scenery.ontology(auto.Ontology.GeoSPARQL)
     l1_core = scenery.ontology(auto.Ontology.L1_Core)
     l1_de = scenery.ontology(auto.Ontology.L1_DE)
 
@@ -133,11 +132,8 @@ def to_auto(cls, scenery: Scenery, identifier=None, parent_identifier=None):
         sign.is_a.append(l1_de.Zulässige_Höchstgeschwindigkeit_50_km_h)
 
     # Geometry
-    wkt_str = "POINT (" + str(cls.position.pos_x) + " " + str(cls.position.pos_y) + " " + str(cls.position.pos_z) + ")"
-    geom = wkt.loads(wkt_str)
-    inst_geom = geo.Geometry()
-    inst_geom.asWKT = [str(geom)]
-    sign.hasGeometry = [inst_geom]
+    geom = shapely.points(float(cls.position.pos_x), float(cls.position.pos_y), float(cls.position.pos_z))
+    sign.hasGeometry = [add_wkt_geometry(geom, scenery)]
 
     # Size
     # TODO size class depends on various factors such as road speeds and sign type.
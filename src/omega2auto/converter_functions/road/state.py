@@ -1,19 +1,60 @@
 from ..utils import *
 
 
-@monkeypatch(omega_format.State)
-def to_auto(cls, scene: Scene, scene_number: int):
+def get_state_segments(cls) -> (np.ndarray, np.ndarray):
+    """
+    Run-length encodes the values of the given state, computed once and cached on the state.
+    :param cls: The OMEGA state.
+    :return: A tuple of a NumPy array of the first frames of all segments of identical values and a NumPy array of the
+        segments' values.
+    """
+    if getattr(cls, "state_segments", None) is None:
+        values = np.asarray(cls.value)
+        starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]])) if len(values) > 0 else \
+            np.array([], dtype=int)
+        cls.state_segments = (starts, values[starts])
+    return cls.state_segments
+
 
-    # Fetches ontologies
-    l6_core = scene.ontology(auto.Ontology.L6_Core)
-    l6_de = scene.ontology(auto.Ontology.L6_DE)
+def set_last_state_segment(cls, scene_number: int):
+    """
+    Records the given frame as the previously converted frame of the state (see on_change of to_auto(...)), as if it
+    had been converted, e.g. when continuing a conversion started by another process.
+    :param cls: The OMEGA state.
+    :param scene_number: The number of the frame within the recording.
+    """
+    starts, _ = get_state_segments(cls)
+    if scene_number < len(cls.value):
+        cls.last_state_segment = (scene_number, int(np.searchsorted(starts, scene_number, side="right")) - 1)
 
-    owl_instance = cls.sign.last_owl_instance[0]
+
+@monkeypatch(omega_format.State)
+def to_auto(cls, scene: Scene, scene_number: int, on_change=False):
+    """
+    Converts the state of the traffic light in the given frame.
+    :param scene: The scene to convert into.
+    :param scene_number: The number of the frame within the recording.
+    :param on_change: If True, a state individual is only created if the state has changed since the previously
+        converted frame (and in the first converted frame).
+    """
+    starts, values = get_state_segments(cls)
 
     if scene_number < len(cls.value):
+        segment = int(np.searchsorted(starts, scene_number, side="right")) - 1
+        if on_change:
+            last = getattr(cls, "last_state_segment", None)
+            cls.last_state_segment = (scene_number, segment)
+            if last is not None and last[0] < scene_number and last[1] == segment:
+                return [(cls, [])]
+
+        # Fetches ontologies
+        l6_core = scene.ontology(auto.Ontology.L6_Core)
+        l6_de = scene.ontology(auto.Ontology.L6_DE)
+
+        owl_instance = cls.sign.last_owl_instance[0]
         state = l6_core.Traffic_Light_State()
         owl_instance.delivers_signal.append(state)
-        sign_value = int(cls.value[scene_number])
+        sign_value = int(values[segment])
         if sign_value == omega_format.ReferenceTypes.StateValue.GREEN:
             state.is_a.append(l6_de.Green_Light)
         elif sign_value == omega_format.ReferenceTypes.StateValue.AMBER:
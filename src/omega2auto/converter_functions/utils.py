@@ -1,15 +1,20 @@
 import owlready2
 import logging
 
+import numpy as np
+import shapely
+
 from pyauto import auto
 from pyauto.models.scene import Scene
 from pyauto.models.scenery import Scenery
 import omega_format
-from shapely import geometry, affinity, wkt
 
 # Logging
 logger = logging.getLogger(__name__)
 
+# Number of decimal places of coordinates in WKT serializations (-1 for full precision)
+_wkt_precision = -1
+
 
 # Decorator for patching methods within OMEGA module.
 
@@ -23,6 +28,10 @@ def monkeypatch(cls):
 
 # Utils
 
+# Registry of OMEGA objects that are the target of pending (deferred) relations, keyed by object id
+_pending_relation_targets = {}
+
+
 def add_relation(owl_entity, owl_relation: str, target_rr_entity, scene: Scene = None):
     if scene and hasattr(target_rr_entity, "last_owl_instance") and \
             target_rr_entity.last_owl_instance[0].world == scene:
@@ -39,6 +48,7 @@ def add_relation(owl_entity, owl_relation: str, target_rr_entity, scene: Scene =
             target_rr_entity.owl_relations.append((owl_entity, owl_relation))
         else:
             target_rr_entity.owl_relations = [(owl_entity, owl_relation)]
+        _pending_relation_targets[id(target_rr_entity)] = target_rr_entity
 
 
 def instantiate_relations(to_rr_entity):
@@ -57,6 +67,225 @@ def instantiate_relations(to_rr_entity):
                 logger.warning("Tried to add relation " + owl_relation + " to " + str(from_owl_entity) +
                                " but could not identify target (a-posteriori mode).")
         to_rr_entity.owl_relations = []
+    _pending_relation_targets.pop(id(to_rr_entity), None)
+
+
+def instantiate_pending_relations(worlds=None, converted_ids=()) -> int:
+    """
+    Instantiates the pending relations of all OMEGA objects that received deferred relations and have already been
+    converted. Objects that have not been converted yet keep their relations pending. Converted objects which are not
+    represented by exactly one OWL individual can not be the target of a relation: their relations are dropped with a
+    warning.
+    :param worlds: An optional list of worlds. If given, only the relations of objects whose last OWL instance lives in
+        one of these worlds are instantiated.
+    :param converted_ids: A list of sets of ids of the OMEGA objects that have been converted (e.g. in the current scene
+        and in the scenery). Their relations are instantiated (or dropped) even if they have no last OWL instance.
+    :return: The number of OMEGA objects whose pending relations were instantiated.
+    """
+    targets = [x for x in _pending_relation_targets.values() if
+               (hasattr(x, "last_owl_instance") and
+                (worlds is None or any(x.last_owl_instance[0].world is w for w in worlds))) or
+               any(id(x) in ids for ids in converted_ids)]
+    for target in targets:
+        instantiate_relations(target)
+    return len(targets)
+
+
+def clear_pending_relations() -> int:
+    """
+    Forgets all pending relations, e.g. before converting a new snippet.
+    :return: The number of forgotten relations.
+    """
+    dropped = 0
+    for target in _pending_relation_targets.values():
+        dropped += len(target.owl_relations)
+        target.owl_relations = []
+    _pending_relation_targets.clear()
+    return dropped
+
+
+def get_class(world, ontology: auto.Ontology, name: str):
+    """
+    Returns the OWL class of the given name from the given ontology of the world. Classes are resolved only once per
+    world and cached on it.
+    :param world: The world (e.g. a scene or scenery).
+    :param ontology: The A.U.T.O. ontology defining the class.
+    :param name: The name of the class.
+    """
+    cache = getattr(world, "owl_class_cache", None)
+    if cache is None:
+        cache = {}
+        world.owl_class_cache = cache
+    key = (ontology, name)
+    if key not in cache:
+        cache[key] = getattr(world.ontology(ontology), name)
+    return cache[key]
+
+
+def is_driveable_lane(scenery: Scenery, lane) -> bool:
+    """
+    :return: Whether the given lane individual is asserted to be a driveable lane (or one of its subclasses).
+    """
+    driveable_lane = get_class(scenery, auto.Ontology.L1_Core, "Driveable_Lane")
+    return any(isinstance(c, owlready2.ThingClass) and issubclass(c, driveable_lane) for c in lane.is_a)
+
+
+def add_driveable_lane_geometry(scenery: Scenery, geom):
+    """
+    Remembers the shapely geometry of a converted driveable lane of the scenery, from which the driveable lanes index is
+    built later on.
+    """
+    if getattr(scenery, "driveable_lanes_geometries", None) is None:
+        scenery.driveable_lanes_geometries = []
+    scenery.driveable_lanes_geometries.append(geom)
+
+
+def index_scenery_individuals(scenery: Scenery, instance_tuples):
+    """
+    Adds the IRIs of the given converted roads, lanes and signs to the typed index of the scenery, such that per-frame
+    converters can look them up without querying the quadstore. Driveable lanes are additionally indexed on their own.
+    :param scenery: The scenery the individuals live in.
+    :param instance_tuples: A list of tuples of OMEGA objects and lists of their OWL individuals.
+    """
+    index = getattr(scenery, "individual_index", None)
+    if index is None:
+        index = {"roads": [], "lanes": [], "driveable_lanes": [], "signs": []}
+        scenery.individual_index = index
+    for rr_inst, owl_inst in instance_tuples:
+        if isinstance(rr_inst, omega_format.Road):
+            index["roads"] += [x.iri for x in owl_inst]
+        elif isinstance(rr_inst, omega_format.Lane):
+            index["lanes"] += [x.iri for x in owl_inst]
+            index["driveable_lanes"] += [x.iri for x in owl_inst if is_driveable_lane(scenery, x)]
+        elif isinstance(rr_inst, omega_format.Sign):
+            index["signs"] += [x.iri for x in owl_inst]
+
+
+def get_scenery_individuals(world, kind: str) -> list:
+    """
+    Returns the indexed scenery individuals of the given kind as seen from the given world. They are resolved only once
+    per world and cached on it.
+    :param world: The scene (or the scenery itself).
+    :param kind: One of "roads", "lanes", "driveable_lanes" and "signs".
+    :return: The list of individuals.
+    """
+    cache = getattr(world, "scenery_individuals", None)
+    if cache is None:
+        cache = {}
+        world.scenery_individuals = cache
+    if kind not in cache:
+        scenery = getattr(world, "_scenery", None) or world
+        index = getattr(scenery, "individual_index", None) or {}
+        cache[kind] = [x for x in (world[iri] for iri in index.get(kind, [])) if x is not None]
+    return cache[kind]
+
+
+# Data properties which may be inserted in bulk. None of them must be read during the conversion: bulk insertion
+# bypasses owlready2's attribute caches of the individuals, which therefore do not see values inserted by a flush after
+# they have been read once.
+BULK_PROPERTIES = frozenset(["has_velocity_x", "has_velocity_y", "has_velocity_z", "has_acceleration_x",
+                             "has_acceleration_y", "has_acceleration_z", "has_roll", "has_pitch", "has_yaw",
+                             "has_roll_rate", "has_pitch_rate", "has_yaw_rate", "has_length", "has_width",
+                             "has_height", "asWKT", "identifier"])
+
+
+class TripleBatch:
+    """
+    Accumulates the data property assertions of the individuals of a world and inserts them into the world's quadstore
+    in one bulk operation per ontology, bypassing owlready2's per-attribute property setters. The asserted values can be
+    read through the individuals' attributes only after flush(), and only if the attribute has not been read before.
+    Note: this relies on the internal schema of owlready2's SQLite quadstore, i.e. on its datas table with the columns
+    c (ontology), s (subject), p (property), o (value) and d (datatype), as written by owlready2 itself.
+    """
+
+    def __init__(self, world):
+        self.world = world
+        # Storids of the data properties by their Python name
+        self._props = {}
+        # Rows of the datas table (subject, property, value, datatype) by the subgraph of the individual's ontology
+        self._rows = {}
+
+    def add(self, owl_inst, name: str, values: list):
+        """
+        Adds assertions of the given data property of the individual.
+        :param owl_inst: The individual.
+        :param name: The Python name of the data property, e.g. "has_length".
+        :param values: The list of values.
+        """
+        prop = self._props.get(name)
+        if prop is None:
+            prop = self.world._props[name].storid
+            self._props[name] = prop
+        rows = self._rows.setdefault(owl_inst.namespace.ontology.graph, [])
+        for value in values:
+            if isinstance(value, np.generic):
+                value = value.item()
+            rows.append((owl_inst.storid, prop) + tuple(owlready2.to_literal(value)))
+
+    def flush(self) -> int:
+        """
+        Inserts all accumulated assertions into the quadstore.
+        :return: The number of inserted assertions.
+        """
+        inserted = 0
+        for graph, rows in self._rows.items():
+            graph.db.executemany("INSERT OR IGNORE INTO datas VALUES (%s,?,?,?,?)" % graph.c, rows)
+            inserted += len(rows)
+        self._rows = {}
+        return inserted
+
+
+def enable_bulk_triples(world):
+    """
+    Makes all subsequent set_data_property(...) calls for individuals of the given world accumulate their assertions in
+    a TripleBatch, which is inserted by flush_triples(...).
+    """
+    world.triple_batch = TripleBatch(world)
+
+
+def flush_triples(world) -> int:
+    """
+    Inserts the accumulated data property assertions of the given world (if bulk triples are enabled for it).
+    :return: The number of inserted assertions.
+    """
+    batch = getattr(world, "triple_batch", None)
+    if batch is None:
+        return 0
+    return batch.flush()
+
+
+def set_data_property(owl_inst, name: str, value):
+    """
+    Sets the data property of the given individual, either through owlready2's property setter or, if bulk triples are
+    enabled for the individual's world and the property is one of BULK_PROPERTIES, by adding it to the world's
+    TripleBatch.
+    :param owl_inst: The individual.
+    :param name: The Python name of the data property, e.g. "has_length".
+    :param value: The value, or the list of values of a non-functional data property.
+    """
+    batch = getattr(owl_inst.namespace.world, "triple_batch", None)
+    # Properties that may be read during the conversion always go through owlready2, see BULK_PROPERTIES
+    if batch is None or name not in BULK_PROPERTIES:
+        setattr(owl_inst, name, value)
+    elif value is not None:
+        batch.add(owl_inst, name, value if isinstance(value, list) else [value])
+
+
+RDFS_SEE_ALSO = "http://www.w3.org/2000/01/rdf-schema#seeAlso"
+
+
+def add_iri_reference(owl_inst, property_iri: str, iri: str):
+    """
+    Asserts that the given individual refers to the resource of the given IRI via the given (annotation) property. The
+    IRI is stored as a resource, not as a string literal, and the resource does not need to exist in the individual's
+    world (e.g. it may be an individual of another scene).
+    :param owl_inst: The individual.
+    :param property_iri: The IRI of the property, e.g. RDFS_SEE_ALSO.
+    :param iri: The IRI of the referenced resource.
+    """
+    world = owl_inst.namespace.world
+    owl_inst.namespace.ontology._add_obj_triple_spo(owl_inst.storid, world._abbreviate(property_iri),
+                                                    world._abbreviate(iri))
 
 
 def add_layer_3_information(cls, owl_entity, scene):
@@ -68,86 +297,197 @@ def add_layer_3_information(cls, owl_entity, scene):
                 add_relation(owl_entity, "modifies", overrides)
 
 
+def get_bounding_box(cls) -> (float, float, float):
+    """
+    :return: The length, width and height of the bounding box of the given OMEGA object (None if not given).
+    """
+    return tuple(float(cls.bb.vec[i]) if len(cls.bb.vec) > i else None for i in range(3))
+
+
 def add_bounding_box(cls, owl_inst):
-    if len(cls.bb.vec) > 0:
-        owl_inst.has_length = float(cls.bb.vec[0])
-    if len(cls.bb.vec) > 1:
-        owl_inst.has_width = float(cls.bb.vec[1])
-    if len(cls.bb.vec) > 2:
-        owl_inst.has_height = float(cls.bb.vec[2])
+    for name, value in zip(("has_length", "has_width", "has_height"), get_bounding_box(cls)):
+        if value is not None:
+            set_data_property(owl_inst, name, value)
+
+
+def set_wkt_precision(precision: int = -1):
+    """
+    Sets the number of decimal places of coordinates in all WKT serializations created by the converter.
+    :param precision: The number of decimal places, -1 for full precision (default).
+    """
+    global _wkt_precision
+    _wkt_precision = precision
+
+
+def to_wkt(geometries):
+    """
+    Serializes the given shapely geometry (or NumPy array of geometries) to WKT using the configured precision.
+    """
+    return shapely.to_wkt(geometries, rounding_precision=_wkt_precision)
+
+
+def polyline_coordinates(polyline, start: int = 0, end: int = None, z=None) -> np.ndarray:
+    """
+    Returns the 3D coordinates of the given OMEGA polyline.
+    :param polyline: The OMEGA polyline (or any object with pos_x, pos_y and pos_z arrays).
+    :param start: The index of the first point.
+    :param end: The index after the last point (default: all points).
+    :param z: An optional value to replace the z coordinates of all points with.
+    :return: A NumPy array of shape (points, 3).
+    """
+    x = np.asarray(polyline.pos_x, dtype=float)[start:end]
+    y = np.asarray(polyline.pos_y, dtype=float)[start:end]
+    if z is None:
+        z = np.asarray(polyline.pos_z, dtype=float)[start:end]
+    return np.stack([x, y, np.broadcast_to(np.asarray(z, dtype=float), x.shape)], axis=1)
+
+
+def add_wkt_geometry(geom, scene):
+    """
+    Creates a GeoSPARQL geometry individual holding the WKT serialization of the given shapely geometry.
+    :param geom: The shapely geometry.
+    :param scene: The scene or scenery to create the individual in.
+    :return: The geometry individual.
+    """
+    inst_geom = get_class(scene, auto.Ontology.GeoSPARQL, "Geometry")()
+    set_data_property(inst_geom, "asWKT", [to_wkt(geom)])
+    return inst_geom
 
 
 def add_geometry_from_polygon(cls, owl_inst, scene):
-    poly = cls.polyline
-    wkt_string = "POLYGON (("
-    if max(poly.pos_z) == 0 and cls.height > 0:
+    coordinates = polyline_coordinates(cls.polyline)
+    if coordinates[:, 2].max() == 0 and cls.height > 0:
         # Note: untested code
-        for i in range(len(poly.pos_x)):
-            wkt_string += str(poly.pos_x[i]) + " " + str(poly.pos_y[i]) + " " + str(poly.pos_z[i]) + ", "
-        for i in range(len(poly.pos_x)):
-            wkt_string += str(poly.pos_x[i]) + " " + str(poly.pos_y[i]) + " " + str(cls.height) + ", "
-        wkt_string += str(poly.pos_x[0]) + " " + str(poly.pos_y[0]) + " " + str(poly.pos_z[0]) + " ))"
-    else:
-        for i in range(len(poly.pos_x)):
-            wkt_string += str(poly.pos_x[i]) + " " + str(poly.pos_y[i]) + " " + str(poly.pos_z[i]) + ", "
-        wkt_string = wkt_string[0:-2] + " ))"
-    geom = wkt.loads(wkt_string)
-    inst_geom = scene.ontology(auto.Ontology.GeoSPARQL).Geometry()
-    inst_geom.asWKT = [str(geom)]
-    owl_inst.hasGeometry = [inst_geom]
+        coordinates = np.concatenate([coordinates, polyline_coordinates(cls.polyline, z=cls.height),
+                                      coordinates[:1]])
+    geom = shapely.polygons(coordinates)
+    owl_inst.hasGeometry = [add_wkt_geometry(geom, scene)]
+
+
+def _trajectory_bounding_boxes(cls, length: float, width: float, height: float):
+    """
+    Computes the rotated 3D bounding boxes of all frames of the trajectory of the given OMEGA object at once. Yields
+    exactly the polygons that rotating each frame's axis-aligned box by its heading using shapely would give.
+    :param cls: The OMEGA object (e.g. a road user or misc object) with a trajectory.
+    :param length: The length of the bounding box.
+    :param width: The width of the bounding box.
+    :param height: The height of the bounding box.
+    :return: A NumPy array of shapely polygons, one per frame of the trajectory.
+    """
+    x = np.asarray(cls.tr.pos_x, dtype=float)
+    y = np.asarray(cls.tr.pos_y, dtype=float)
+    z = np.asarray(cls.tr.pos_z, dtype=float)
+    x_min = x - 0.5 * length
+    x_max = x + 0.5 * length
+    y_min = y - 0.5 * width
+    y_max = y + 0.5 * width
+    z_max = z + height
+    # Corners in the order l11, l12, l22, l21, l11, h11, h12, h22, h21, h11, l11, l12, h12, h22, l22, l21, h21, h11, l11
+    xs = np.stack([x_min, x_min, x_max, x_max, x_min, x_min, x_min, x_max, x_max, x_min, x_min, x_min, x_min, x_max,
+                   x_max, x_max, x_max, x_min, x_min], axis=1)
+    ys = np.stack([y_min, y_max, y_max, y_min, y_min, y_min, y_max, y_max, y_min, y_min, y_min, y_max, y_max, y_max,
+                   y_max, y_min, y_min, y_min, y_min], axis=1)
+    zs = np.stack([z, z, z, z, z, z_max, z_max, z_max, z_max, z_max, z, z, z_max, z_max, z, z, z_max, z_max, z],
+                  axis=1)
+    # Rotation around the center of the bounding box, as done by shapely.affinity.rotate
+    angle = np.asarray(cls.tr.heading, dtype=float) * np.pi / 180.0
+    cos = np.cos(angle)
+    sin = np.sin(angle)
+    cos[np.abs(cos) < 2.5e-16] = 0.0
+    sin[np.abs(sin) < 2.5e-16] = 0.0
+    x0 = ((x_min + x_max) / 2.0)[:, np.newaxis]
+    y0 = ((y_min + y_max) / 2.0)[:, np.newaxis]
+    cos = cos[:, np.newaxis]
+    sin = sin[:, np.newaxis]
+    x_off = x0 - x0 * cos + y0 * sin
+    y_off = y0 - x0 * sin - y0 * cos
+    rotated = np.stack([cos * xs - sin * ys + x_off, sin * xs + cos * ys + y_off, zs], axis=2)
+    return shapely.polygons(rotated)
+
+
+def get_trajectory_geometries(cls, length: float, width: float, height: float):
+    """
+    Returns the rotated 3D bounding boxes of all frames of the trajectory of the given OMEGA object as well as their
+    WKT serializations. Both are computed once for the whole trajectory and cached on the object.
+    :param cls: The OMEGA object (e.g. a road user or misc object) with a trajectory.
+    :param length: The length of the bounding box.
+    :param width: The width of the bounding box.
+    :param height: The height of the bounding box.
+    :return: A tuple of a NumPy array of shapely polygons and a NumPy array of their WKT strings, one per frame.
+    """
+    key = (length, width, height, _wkt_precision)
+    if getattr(cls, "trajectory_geometries_key", None) != key:
+        geometries = _trajectory_bounding_boxes(cls, length, width, height)
+        cls.trajectory_geometries = (geometries, to_wkt(geometries))
+        cls.trajectory_geometries_key = key
+    return cls.trajectory_geometries
 
 
 def add_geometry_from_trajectory(cls, owl_inst, time, scene: Scene):
-    owl_inst_geometry = scene.ontology(auto.Ontology.GeoSPARQL).Geometry()
-    l11 = (cls.tr.pos_x[time] - 0.5 * owl_inst.has_length, cls.tr.pos_y[time] -
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time])
-    l12 = (cls.tr.pos_x[time] - 0.5 * owl_inst.has_length, cls.tr.pos_y[time] +
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time])
-    l21 = (cls.tr.pos_x[time] + 0.5 * owl_inst.has_length, cls.tr.pos_y[time] -
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time])
-    l22 = (cls.tr.pos_x[time] + 0.5 * owl_inst.has_length, cls.tr.pos_y[time] +
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time])
-    h11 = (cls.tr.pos_x[time] - 0.5 * owl_inst.has_length, cls.tr.pos_y[time] -
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time] +
-           owl_inst.has_height)
-    h12 = (cls.tr.pos_x[time] - 0.5 * owl_inst.has_length, cls.tr.pos_y[time] +
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time] +
-           owl_inst.has_height)
-    h21 = (cls.tr.pos_x[time] + 0.5 * owl_inst.has_length, cls.tr.pos_y[time] -
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time] +
-           owl_inst.has_height)
-    h22 = (cls.tr.pos_x[time] + 0.5 * owl_inst.has_length, cls.tr.pos_y[time] +
-           0.5 * owl_inst.has_width, cls.tr.pos_z[time] +
-           owl_inst.has_height)
-    bb = geometry.Polygon([l11, l12, l22, l21, l11, h11, h12, h22, h21, h11, l11, l12, h12, h22, l22, l21, h21, h11,
-                           l11])
-    rotated_bb = affinity.rotate(bb, cls.tr.heading[time])
-    owl_inst_geometry.asWKT = [rotated_bb.wkt]
+    owl_inst_geometry = get_class(scene, auto.Ontology.GeoSPARQL, "Geometry")()
+    # Dimensions are taken from the OMEGA object, as the individual's properties may not have been inserted yet
+    _, wkts = get_trajectory_geometries(cls, *get_bounding_box(cls))
+    set_data_property(owl_inst_geometry, "asWKT", [str(wkts[time])])
     owl_inst.hasGeometry = [owl_inst_geometry]
 
 
+class DriveableLanesIndex:
+    """
+    Spatial index over the driveable lanes of a scenery, built once after the scenery has been converted. Holds the
+    prepared union of all driveable lanes as well as an STRtree over its individual polygons, which quickly rejects
+    geometries that are not even close to any driveable lane. The union is computed from the lane geometries kept in
+    memory during conversion, or from the indexed driveable lanes' WKT if the scenery was loaded from the cache.
+    """
+
+    def __init__(self, scenery: Scenery):
+        geometries = getattr(scenery, "driveable_lanes_geometries", None)
+        if geometries is None and getattr(scenery, "individual_index", None) is not None:
+            geometries = [shapely.from_wkt(lane.hasGeometry[0].asWKT[0])
+                          for lane in get_scenery_individuals(scenery, "driveable_lanes") if len(lane.hasGeometry) > 0]
+        if geometries is not None:
+            self.geometry = shapely.union_all(geometries) if len(geometries) > 0 else None
+        else:
+            self.geometry = scenery.get_all_driveable_lanes_geometry()
+        if self.geometry is not None and not self.geometry.is_empty:
+            shapely.prepare(self.geometry)
+            self._tree = shapely.STRtree(shapely.get_parts(self.geometry))
+        else:
+            self._tree = None
+
+    def contains(self, geometries):
+        """
+        Checks which of the given geometries are completely contained in the driveable lanes.
+        :param geometries: A NumPy array of shapely geometries.
+        :return: A NumPy array of booleans.
+        """
+        result = np.zeros(len(geometries), dtype=bool)
+        if self._tree is not None and len(geometries) > 0:
+            candidates = np.unique(self._tree.query(geometries)[0])
+            if len(candidates) > 0:
+                result[candidates] = shapely.contains(self.geometry, geometries[candidates])
+        return result
+
+
+def get_driveable_lanes_index(scenery: Scenery) -> DriveableLanesIndex:
+    """
+    Returns the spatial index of the driveable lanes of the given scenery, builds it on first use.
+    :param scenery: The converted scenery.
+    """
+    if getattr(scenery, "driveable_lanes_index", None) is None:
+        scenery.driveable_lanes_index = DriveableLanesIndex(scenery)
+    return scenery.driveable_lanes_index
+
+
+# Trajectory attributes of OMEGA objects and the corresponding data properties in A.U.T.O.
+_PHYSICAL_PROPERTIES = [("vel_longitudinal", "has_velocity_x"), ("vel_lateral", "has_velocity_y"),
+                        ("vel_z", "has_velocity_z"), ("acc_longitudinal", "has_acceleration_x"),
+                        ("acc_lateral", "has_acceleration_y"), ("acc_z", "has_acceleration_z"), ("roll", "has_roll"),
+                        ("pitch", "has_pitch"), ("heading", "has_yaw"), ("roll_der", "has_roll_rate"),
+                        ("pitch_der", "has_pitch_rate"), ("heading_der", "has_yaw_rate")]
+
+
 def add_physical_properties(cls, owl_inst, time):
-    if cls.tr.vel_longitudinal is not None:
-        owl_inst.has_velocity_x = float(cls.tr.vel_longitudinal[time])
-    if cls.tr.vel_lateral is not None:
-        owl_inst.has_velocity_y = float(cls.tr.vel_lateral[time])
-    if cls.tr.vel_z is not None:
-        owl_inst.has_velocity_z = float(cls.tr.vel_z[time])
-    if cls.tr.acc_longitudinal is not None:
-        owl_inst.has_acceleration_x = float(cls.tr.acc_longitudinal[time])
-    if cls.tr.acc_lateral is not None:
-        owl_inst.has_acceleration_y = float(cls.tr.acc_lateral[time])
-    if cls.tr.acc_z is not None:
-        owl_inst.has_acceleration_z = float(cls.tr.acc_z[time])
-    if cls.tr.roll is not None:
-        owl_inst.has_roll = float(cls.tr.roll[time])
-    if cls.tr.pitch is not None:
-        owl_inst.has_pitch = float(cls.tr.pitch[time])
-    if cls.tr.heading is not None:
-        owl_inst.has_yaw = float(cls.tr.heading[time])
-    if cls.tr.roll_der is not None:
-        owl_inst.has_roll_rate = float(cls.tr.roll_der[time])
-    if cls.tr.pitch_der is not None:
-        owl_inst.has_pitch_rate = float(cls.tr.pitch_der[time])
-    if cls.tr.heading_der is not None:
-        owl_inst.has_yaw_rate = float(cls.tr.heading_der[time])
\ No newline at end of file
+    for attribute, name in _PHYSICAL_PROPERTIES:
+        values = getattr(cls.tr, attribute)
+        if values is not None:
+            set_data_property(owl_inst, name, float(values[time]))
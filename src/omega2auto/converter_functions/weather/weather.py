@@ -1,18 +1,139 @@
 from ..utils import *
 
 
-@monkeypatch(omega_format.Weather)
-def to_auto(cls, scene: Scene, scene_number: int):
+def _get_weather_arrays(cls) -> list:
+    """
+    :return: All time-dependent arrays of the OMEGA weather.
+    """
+    return [cls.precipitation.type, cls.precipitation.amount_hourly, cls.precipitation.amount_minute,
+            cls.precipitation.snow_depth, cls.precipitation.new_snow_depth, cls.wind.wind_speed,
+            cls.wind.wind_direction, cls.gust_of_wind.wind_speed, cls.gust_of_wind.type, cls.cloudiness.degree,
+            cls.temperature.air_temp, cls.temperature.air_temp_5cm, cls.temperature.ground_temp,
+            cls.visibility.visibility, cls.air_pressure.air_pressure_nn, cls.humidity.humidity,
+            cls.road_condition.spray, cls.road_condition.surface_condition, cls.solar.diff_solar_radiation,
+            cls.solar.longwave_down_radiation, cls.solar.solar_hours, cls.solar.solar_incoming_radiation]
 
-    # Fetches ontologies
+
+def get_weather_runs(cls) -> np.ndarray:
+    """
+    Assigns each frame of the recording the number of its run, i.e. of the maximal sequence of consecutive frames with
+    identical weather. Computed once and cached on the weather.
+    :param cls: The OMEGA weather.
+    :return: A NumPy array of run numbers, one per frame for which any weather information is recorded.
+    """
+    if getattr(cls, "weather_runs", None) is None:
+        arrays = [np.asarray(a) for a in _get_weather_arrays(cls)]
+        frames = max((len(a) for a in arrays), default=0)
+        changed = np.zeros(max(frames - 1, 0), dtype=bool)
+        for a in arrays:
+            if len(a) > 1:
+                same = a[1:] == a[:-1]
+                if np.issubdtype(a.dtype, np.floating):
+                    # Missing values are recorded as NaN, which does not equal itself
+                    same |= np.isnan(a[1:]) & np.isnan(a[:-1])
+                changed[:len(a) - 1] |= ~same
+            if 0 < len(a) < frames:
+                # Information is not recorded anymore from here on
+                changed[len(a) - 1] = True
+        cls.weather_runs = np.concatenate([np.zeros(min(frames, 1), dtype=int), np.cumsum(changed)])
+    return cls.weather_runs
+
+
+def resume_delta(cls, previous_scene_numbers, scene_number: int, scene_factory):
+    """
+    Restores the state of the delta mode (see to_auto(...)) as if the given previous frames had been converted right
+    before the given frame, e.g. by another process converting the preceding chunk of frames. If the weather of the
+    given frame continues the run of the last previous frame, the first converted frame of that run is described again
+    in a throwaway scene to obtain the IRI of the environment that the following frames refer to.
+    :param cls: The OMEGA weather.
+    :param previous_scene_numbers: The sorted array of frames converted before.
+    :param scene_number: The number of the next frame to convert.
+    :param scene_factory: A function creating a scene for the given frame number, which is closed afterwards.
+    """
+    cls.last_weather_run = None
+    runs = get_weather_runs(cls)
+    frames = np.asarray(previous_scene_numbers, dtype=int)
+    previous_runs = np.full(len(frames), -1)
+    recorded = frames < len(runs)
+    previous_runs[recorded] = runs[frames[recorded]]
+    run = int(runs[scene_number]) if scene_number < len(runs) else -1
+    if len(frames) == 0 or previous_runs[-1] != run:
+        return
+    # Runs are non-decreasing (followed by -1 for unrecorded frames), so the frames of the run are contiguous
+    other = np.flatnonzero(previous_runs != run)
+    first = int(frames[other[-1] + 1]) if len(other) > 0 else int(frames[0])
+    scene = scene_factory(first)
+    cls.to_auto(scene, first, delta=True)
+    scene.close()
+    cls.last_weather_run = (run, int(frames[-1])) + cls.last_weather_run[2:]
+
+
+def _count_environment_individuals(environment) -> int:
+    """
+    :return: The number of individuals describing the given environment (including itself).
+    """
+    return 1 + sum(1 + len(getattr(x, "has_environment_phenomenon", [])) for x in environment.consists_of)
+
+
+def _add_road_condition(cls, scene: Scene, scene_number: int):
+    """
+    Adds the road condition of the given frame to the roads of the scene.
+    """
     ph = scene.ontology(auto.Ontology.Physics)
-    l1_core = scene.ontology(auto.Ontology.L1_Core)
     l3_de = scene.ontology(auto.Ontology.L3_DE)
+    roads = get_scenery_individuals(scene, "roads")
+
+    # surface_condition - wetness is on layer 1
+    if scene_number < len(cls.road_condition.surface_condition) and \
+            (cls.road_condition.surface_condition[scene_number] == omega_format.ReferenceTypes.
+             RoadConditionSurfaceCondition.MOIST):
+        for r in roads:
+            r.is_a.append(ph.Moist_Physical_Object)
+
+    # maintenance_status is on layer 3
+    for r in roads:
+        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus. \
+                UNTREATED:
+            r.is_a.append(l3_de.Road_Without_Contamination)
+        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus.DIRTY:
+            r.is_a.append(l3_de.Road_With_Dirt)
+        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus.GRIT:
+            r.is_a.append(l3_de.Road_With_Grit)
+        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus.SALTED:
+            r.is_a.append(l3_de.Road_With_Salt)
+
+
+@monkeypatch(omega_format.Weather)
+def to_auto(cls, scene: Scene, scene_number: int, delta=False):
+    """
+    Converts the weather in the given frame into an environment.
+    :param scene: The scene to convert into.
+    :param scene_number: The number of the frame within the recording.
+    :param delta: If True and the weather has not changed since the previously converted frame, the environment is not
+        described again. Instead, a bare environment referring to the IRI of the environment holding the description
+        (via rdfs:seeAlso) is created. The number of individuals saved by this is stored in
+        cls.last_saved_individuals.
+    """
+    cls.last_saved_individuals = 0
+
+    # Fetches ontologies
     l5_de = scene.ontology(auto.Ontology.L5_DE)
     l5_core = scene.ontology(auto.Ontology.L5_Core)
 
     environment = l5_core.Environment()
 
+    if delta:
+        runs = get_weather_runs(cls)
+        run = int(runs[scene_number]) if scene_number < len(runs) else -1
+        last_run = getattr(cls, "last_weather_run", None)
+        if last_run is not None and last_run[0] == run and last_run[1] < scene_number:
+            _, _, iri, individuals = last_run
+            add_iri_reference(environment, RDFS_SEE_ALSO, iri)
+            _add_road_condition(cls, scene, scene_number)
+            cls.last_weather_run = (run, scene_number, iri, individuals)
+            cls.last_saved_individuals = individuals - 1
+            return [(cls, [environment])]
+
     # precipitation
     # - type
     if scene_number < len(cls.precipitation.type):
@@ -146,13 +267,8 @@ def to_auto(cls, scene: Scene, scene_number: int):
     # road_condition
     # surface_condition
     if scene_number < len(cls.road_condition.surface_condition):
-        # Wetness is on layer 1
+        # Wetness is on layer 1 (see _add_road_condition(...)), actual water bodies are on layer 5
         if (cls.road_condition.surface_condition[scene_number] == omega_format.ReferenceTypes.
-                RoadConditionSurfaceCondition.MOIST):
-            for r in scene.search(type=l1_core.Road):
-                r.is_a.append(ph.Moist_Physical_Object)
-        # Actual water bodies are on layer 5
-        elif (cls.road_condition.surface_condition[scene_number] == omega_format.ReferenceTypes.
                 RoadConditionSurfaceCondition.WET):
             water_layer = l5_de.Water_Layer()
             environment.consists_of.append(water_layer)
@@ -188,16 +304,9 @@ def to_auto(cls, scene: Scene, scene_number: int):
             environment.consists_of.append(snow)
             environment.consists_of.append(ice)
 
-    # maintenance_status is on layer 3
-    for r in scene.search(type=l1_core.Road):
-        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus. \
-                UNTREATED:
-            r.is_a.append(l3_de.Road_Without_Contamination)
-        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus.DIRTY:
-            r.is_a.append(l3_de.Road_With_Dirt)
-        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus.GRIT:
-            r.is_a.append(l3_de.Road_With_Grit)
-        if cls.road_condition.maintenance_status == omega_format.ReferenceTypes.RoadConditionMaintenanceStatus.SALTED:
-            r.is_a.append(l3_de.Road_With_Salt)
+    _add_road_condition(cls, scene, scene_number)
+
+    if delta:
+        cls.last_weather_run = (run, scene_number, environment.iri, _count_environment_individuals(environment))
 
     return [(cls, [environment])]
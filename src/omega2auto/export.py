@@ -0,0 +1,188 @@
+import gzip
+import logging
+import math
+import os
+
+# Logging
+logger = logging.getLogger(__name__)
+
+# File extensions of the supported export formats. The exporter writes one triple per line, which is valid N-Triples
+# and, since Turtle is a superset of N-Triples, valid Turtle as well.
+FORMATS = {"nt": ".nt", "ttl": ".ttl"}
+
+_RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+_OWL_ONTOLOGY = "http://www.w3.org/2002/07/owl#Ontology"
+_OWL_IMPORTS = "http://www.w3.org/2002/07/owl#imports"
+_XSD_DOUBLE = "<http://www.w3.org/2001/XMLSchema#double>"
+
+
+def get_rowids(world) -> (int, int):
+    """
+    Returns the largest row IDs of the object and data triples of the given owlready2 world. Triples inserted later on
+    have larger row IDs, which allows to export only the triples created after this point.
+    :param world: The owlready2 world.
+    :return: A tuple of the largest row IDs of the objs and datas tables.
+    """
+    return tuple(world.graph.execute("SELECT COALESCE(MAX(rowid), 0) FROM " + table).fetchone()[0]
+                 for table in ("objs", "datas"))
+
+
+def get_ontologies(world) -> list:
+    """
+    Returns the ontologies of the given owlready2 world that hold triples created after ScenarioExporter.begin(...).
+    :param world: The owlready2 world.
+    :return: A sorted list of the IRIs of the ontologies (without trailing # or /).
+    """
+    objs_rowid, datas_rowid = getattr(world, "export_rowids", (0, 0))
+    iris = [iri for iri, in world.graph.execute(
+        "SELECT iri FROM ontologies WHERE c IN (SELECT c FROM objs WHERE rowid > ? UNION SELECT c FROM datas WHERE "
+        "rowid > ?)", (objs_rowid, datas_rowid))]
+    return sorted(iri[:-1] if iri.endswith("#") or iri.endswith("/") else iri for iri in iris)
+
+
+def _format_number(value: float) -> str or None:
+    """
+    :return: The xsd:double literal of the given float if it can not be written as xsd:decimal, None otherwise.
+    """
+    if math.isnan(value):
+        return "\"NaN\"^^" + _XSD_DOUBLE
+    if math.isinf(value):
+        return "\"%sINF\"^^%s" % ("-" if value < 0 else "", _XSD_DOUBLE)
+    if "e" in repr(value):
+        return "\"%r\"^^%s" % (value, _XSD_DOUBLE)
+    return None
+
+
+def _escape(literal) -> str:
+    return str(literal).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n").replace("\r", "\\r")
+
+
+class ScenarioExporter:
+    """
+    Streams the triples of converted scenes (and their scenery) to one file per world right after their conversion, such
+    that the worlds can be released immediately. Only the triples created after begin(...) has been called for a world
+    are exported, i.e. neither the A.U.T.O. TBox nor (for scenes) the scenery. Each file starts with the declarations of
+    its ontologies and their imports (the TBox and, for scenes, the scenery), such that it can be loaded after the TBox
+    and the scenery. The exported files are listed in a .kbs file, the scenery first and then the scenes in their order.
+    """
+
+    def __init__(self, prefix: str, fmt: str = "nt", compress: bool = False, first_scene: int = 0):
+        """
+        :param prefix: The path prefix of the files, e.g. out/scenario_0. Scenes are stored as <prefix>_<j>.nt, the
+            scenery as <prefix>_scenery.nt and the index as <prefix>.kbs.
+        :param fmt: The export format, "nt" (N-Triples) or "ttl" (Turtle).
+        :param compress: Whether to gzip-compress the exported files.
+        :param first_scene: The index of the first exported scene, e.g. if other processes export the preceding scenes.
+        """
+        if fmt not in FORMATS:
+            raise ValueError("Unknown export format " + str(fmt) + ", expected one of " + ", ".join(FORMATS))
+        self.prefix = prefix
+        self.extension = FORMATS[fmt] + (".gz" if compress else "")
+        self.compress = compress
+        self.first_scene = first_scene
+        self.scene_files = []
+        self.scenery_file = None
+        self.scenery_ontologies = None
+
+    @staticmethod
+    def begin(world):
+        """
+        Marks the current end of the quadstore of the given world (e.g. right after loading its TBox), only triples
+        created afterwards are exported.
+        """
+        world.export_rowids = get_rowids(world)
+
+    def _open(self, file: str):
+        if self.compress:
+            return gzip.open(file, "wt", encoding="utf-8")
+        return open(file, "w", encoding="utf-8")
+
+    def _write(self, world, file: str, imports=()) -> int:
+        """
+        Writes the triples of the given world created after begin(...) to the given file, preceded by the declarations
+        of the ontologies holding them and their imports.
+        :param imports: The IRIs of further ontologies imported by each written ontology (e.g. the scenery's).
+        :return: The number of written triples.
+        """
+        objs_rowid, datas_rowid = getattr(world, "export_rowids", (0, 0))
+        iris = {}
+
+        def term(storid) -> str:
+            if storid < 0:
+                return "_:b" + str(-storid)
+            if storid not in iris:
+                iris[storid] = "<" + world._unabbreviate(storid) + ">"
+            return iris[storid]
+
+        written = 0
+        with self._open(file) as f:
+            rdf_type, owl_ontology, owl_imports = (world._abbreviate(iri) for iri in
+                                                   (_RDF_TYPE, _OWL_ONTOLOGY, _OWL_IMPORTS))
+            for ontology in get_ontologies(world):
+                storid = world._abbreviate(ontology)
+                header = {(storid, rdf_type, term(owl_ontology))}
+                # Triples created after begin(...) (e.g. imports added during the conversion) are written below
+                header.update((storid, owl_imports, term(o)) for o, in world.graph.execute(
+                    "SELECT o FROM objs WHERE s = ? AND p = ? AND rowid <= ?", (storid, owl_imports, objs_rowid)))
+                header.update((storid, owl_imports, "<" + iri + ">") for iri in imports if iri != ontology)
+                for s, p, o in sorted(header, key=lambda x: (x[1] != rdf_type, x[2])):
+                    f.write("%s %s %s .\n" % (term(s), term(p), o))
+                    written += 1
+            for s, p, o in world.graph.execute("SELECT s, p, o FROM objs WHERE rowid > ?", (objs_rowid,)):
+                f.write("%s %s %s .\n" % (term(s), term(p), term(o)))
+                written += 1
+            for s, p, o, d in world.graph.execute("SELECT s, p, o, d FROM datas WHERE rowid > ?", (datas_rowid,)):
+                if o is None:
+                    # SQLite stores NaN as NULL
+                    literal = _format_number(math.nan)
+                elif isinstance(o, float) and _format_number(o) is not None:
+                    literal = _format_number(o)
+                elif isinstance(d, str) and d.startswith("@"):
+                    literal = "\"%s\"%s" % (_escape(o), d)
+                elif isinstance(d, int) and d != 0:
+                    literal = "\"%s\"^^%s" % (_escape(o), term(d))
+                else:
+                    literal = "\"%s\"" % _escape(o)
+                f.write("%s %s %s .\n" % (term(s), term(p), literal))
+                written += 1
+        return written
+
+    def export_scenery(self, scenery) -> str:
+        """
+        Exports the triples of the given scenery.
+        :return: The path to the exported file.
+        """
+        self.scenery_file = self.prefix + "_scenery" + self.extension
+        self.scenery_ontologies = get_ontologies(scenery)
+        written = self._write(scenery, self.scenery_file)
+        logger.debug("Exported %d triples of scenery to %s", written, self.scenery_file)
+        return self.scenery_file
+
+    def export_scene(self, scene, scenery=None) -> str:
+        """
+        Exports the triples of the given scene. Scenery individuals are referred to by their IRIs and the scene's
+        ontologies import the ontologies of the scenery.
+        :param scene: The scene.
+        :param scenery: The scenery of the scene, only needed if it has not been exported by this exporter.
+        :return: The path to the exported file.
+        """
+        if self.scenery_ontologies is None and scenery is not None:
+            self.scenery_ontologies = get_ontologies(scenery)
+        file = self.prefix + "_" + str(self.first_scene + len(self.scene_files)) + self.extension
+        written = self._write(scene, file, self.scenery_ontologies or ())
+        self.scene_files.append(file)
+        logger.debug("Exported %d triples of scene to %s", written, file)
+        return file
+
+    def finish(self) -> str:
+        """
+        Writes the .kbs file listing the exported scenery and scene files in their order.
+        :return: The path to the .kbs file.
+        """
+        kbs_file = self.prefix + ".kbs"
+        folder = os.path.dirname(os.path.abspath(kbs_file))
+        files = ([self.scenery_file] if self.scenery_file is not None else []) + self.scene_files
+        with open(kbs_file, "w") as f:
+            for file in files:
+                f.write(os.path.relpath(os.path.abspath(file), folder) + "\n")
+        return kbs_file
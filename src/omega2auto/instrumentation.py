@@ -0,0 +1,153 @@
+import json
+import logging
+import time
+
+# Logging
+logger = logging.getLogger(__name__)
+
+
+class _Timer:
+    """
+    Context manager adding the elapsed time of its body to a stage of an instrumentation.
+    """
+
+    __slots__ = ("_instrumentation", "_stage", "_start")
+
+    def __init__(self, instrumentation, stage: str):
+        self._instrumentation = instrumentation
+        self._stage = stage
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._instrumentation.add_time(self._stage, time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    """
+    Context manager doing nothing, used when instrumentation is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def _triple_count(world) -> int:
+    """
+    Returns the number of triples that have been inserted into the quadstore of the given owlready2 world so far.
+    """
+    return sum(world.graph.execute("SELECT COALESCE(MAX(rowid), 0) FROM " + table).fetchone()[0]
+               for table in ("objs", "datas"))
+
+
+class Instrumentation:
+    """
+    Collects per-stage timings and counters (e.g. of created OWL individuals and triples) of the converter pipeline.
+    Pass an instance to convert(...) and inspect its summary afterwards or export it as JSON.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.times = {}
+        self.calls = {}
+        self.counters = {}
+
+    def time(self, stage: str):
+        """
+        Returns a context manager measuring the time spent in its body for the given stage.
+        :param stage: The name of the stage, e.g. "scenery".
+        """
+        return _Timer(self, stage)
+
+    def add_time(self, stage: str, seconds: float):
+        self.times[stage] = self.times.get(stage, 0) + seconds
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+
+    def count(self, name: str, n: int = 1):
+        """
+        Increases the counter of the given name.
+        :param name: The name of the counter.
+        :param n: The value to increase the counter by.
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def count_individuals(self, instance_tuples):
+        """
+        Counts the OWL individuals created by the to_auto functions, per OMEGA type.
+        :param instance_tuples: A list of tuples of OMEGA objects and lists of their OWL individuals.
+        """
+        for rr_inst, owl_inst in instance_tuples:
+            self.count("individuals." + type(rr_inst).__name__, len(owl_inst))
+
+    def triples(self, world) -> int:
+        """
+        Returns the number of triples inserted into the given world so far, to be used for counting triples by
+        comparing it before and after a stage.
+        :param world: The owlready2 world.
+        """
+        return _triple_count(world)
+
+    def merge(self, summary: dict):
+        """
+        Merges a summary (e.g. from a worker process) into this instrumentation.
+        :param summary: The summary as returned by summary().
+        """
+        for stage, entry in summary["stages"].items():
+            self.times[stage] = self.times.get(stage, 0) + entry["time"]
+            self.calls[stage] = self.calls.get(stage, 0) + entry["calls"]
+        for name, value in summary["counters"].items():
+            self.count(name, value)
+
+    def summary(self) -> dict:
+        """
+        :return: A dictionary with the total time and number of calls per stage and the values of all counters.
+        """
+        return {"stages": {stage: {"time": self.times[stage], "calls": self.calls[stage]} for stage in self.times},
+                "counters": dict(self.counters)}
+
+    def to_json(self, file: str):
+        """
+        Exports the summary as a JSON file.
+        :param file: The path to the JSON file.
+        """
+        with open(file, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class _DisabledInstrumentation(Instrumentation):
+    """
+    Instrumentation that records nothing and costs (almost) nothing.
+    """
+
+    enabled = False
+
+    def time(self, stage: str):
+        return _NULL_TIMER
+
+    def add_time(self, stage: str, seconds: float):
+        pass
+
+    def count(self, name: str, n: int = 1):
+        pass
+
+    def count_individuals(self, instance_tuples):
+        pass
+
+    def triples(self, world) -> int:
+        return 0
+
+
+DISABLED = _DisabledInstrumentation()
@@ -0,0 +1,136 @@
+import logging
+import os
+import tempfile
+import types
+
+import numpy as np
+
+# Logging
+logger = logging.getLogger(__name__)
+
+# Groups holding dynamic objects in the different versions of the OMEGA format
+_DYNAMIC_GROUPS = ["dynamicObjects", "roadUser", "miscObject"]
+_LEGACY_VERSIONS = ["v3.0", "v3.1"]
+
+
+class RecordingIndex:
+    """
+    Lightweight index of an OMEGA HDF5 file, read without materializing any trajectories: the timestamps and, for each
+    dynamic object, its birth and end frame, type and the objects it references. Road users are keyed by their ID as
+    given to extract_snippets(...), i.e. the name of their HDF5 group (as integer for legacy v3 files).
+    """
+
+    def __init__(self, filename: str):
+        import h5py
+
+        self.filename = filename
+        self.road_users = {}
+        self.ego_id = None
+        # Tuples of group name, object name, birth, end and names of referenced objects
+        self._objects = []
+        with h5py.File(filename, "r") as file:
+            self.legacy = file.attrs.get("formatVersion") in _LEGACY_VERSIONS
+            self.timestamps = types.SimpleNamespace(val=file["timestamps"][:] if "timestamps" in file else
+                                                    np.array([]))
+            for group_name in _DYNAMIC_GROUPS:
+                if group_name not in file:
+                    continue
+                for name, group in file[group_name].items():
+                    if not hasattr(group, "attrs") or "birthStamp" not in group.attrs:
+                        continue
+                    birth = int(group.attrs["birthStamp"])
+                    end = birth + group["trajectory"]["posX"].shape[0] - 1
+                    references = {str(group.attrs[a]) for a in ("connectedTo", "attachedTo") if a in group.attrs}
+                    self._objects.append((group_name, name, birth, end, references))
+                    if "isDataRecorder" in group.attrs:
+                        key = int(name) if self.legacy else name
+                        road_user = types.SimpleNamespace(birth=birth, end=end, type=int(group.attrs["type"]),
+                                                          is_data_recorder=bool(group.attrs["isDataRecorder"]))
+                        self.road_users[key] = road_user
+                        if road_user.is_data_recorder and self.ego_id is None:
+                            self.ego_id = key
+
+    def get_snippet_tp_ids(self) -> list:
+        """
+        :return: The IDs of all road users that may become the ego vehicle of a snippet (the data recorder if given,
+            all cars otherwise). This is a superset of the snippets omega_format extracts by default, as static cars
+            are only known after loading their trajectories.
+        """
+        import omega_format
+
+        if self.ego_id is not None:
+            return [self.ego_id]
+        car = omega_format.ReferenceTypes.RoadUserType.CAR
+        return [k for k, v in self.road_users.items() if v.type == car]
+
+    def get_window(self, ids: list) -> (int, int):
+        """
+        :return: The first and last frame covered by the snippets of the given road user IDs.
+        """
+        if self.ego_id in ids or any(i not in self.road_users for i in ids):
+            return 0, len(self.timestamps.val) - 1
+        return min(self.road_users[i].birth for i in ids), max(self.road_users[i].end for i in ids)
+
+    def get_objects_in_window(self, birth: int, end: int) -> set:
+        """
+        :return: A set of tuples of group and object names of all dynamic objects that need to be loaded for the given
+            window: those alive within it, data recorders and (transitively) all objects referenced by these.
+        """
+        names = {}
+        for group_name, name, obj_birth, obj_end, references in self._objects:
+            names.setdefault(group_name, {})[name] = references
+        keep = {(group_name, name) for group_name, name, obj_birth, obj_end, _ in self._objects
+                if obj_birth <= end and obj_end >= birth}
+        keep |= {(group_name, str(key)) for group_name in names for key, v in self.road_users.items()
+                 if v.is_data_recorder and str(key) in names[group_name]}
+        pending = list(keep)
+        while len(pending) > 0:
+            group_name, name = pending.pop()
+            for reference in names[group_name][name]:
+                if reference in names[group_name] and (group_name, reference) not in keep:
+                    keep.add((group_name, reference))
+                    pending.append((group_name, reference))
+        return keep
+
+
+def read_index(filename: str) -> RecordingIndex:
+    """
+    Reads the lightweight index of the given OMEGA HDF5 file.
+    :param filename: The path to the OMEGA HDF5 file.
+    """
+    logger.debug("Reading index of OMEGA file %s", filename)
+    return RecordingIndex(filename)
+
+
+def load_window(index: RecordingIndex, birth: int, end: int):
+    """
+    Loads the reference recording of the indexed file, but only with the dynamic objects needed for the given window of
+    frames. The road network, states, weather and meta data are loaded completely. Only the HDF5 datasets of the
+    selected objects are read from disk: they are copied into a reduced temporary file, which is then loaded by
+    omega_format.
+    :param index: The index of the OMEGA HDF5 file.
+    :param birth: The first frame of the window.
+    :param end: The last frame of the window.
+    :return: The ReferenceRecording instance.
+    """
+    import h5py
+    import omega_format
+
+    keep = index.get_objects_in_window(birth, end)
+    logger.debug("Loading %d of %d dynamic objects for frames %d - %d", len(keep), len(index._objects), birth, end)
+    with tempfile.TemporaryDirectory() as folder:
+        reduced_file = os.path.join(folder, os.path.basename(index.filename))
+        with h5py.File(index.filename, "r") as src, h5py.File(reduced_file, "w") as dst:
+            for key, value in src.attrs.items():
+                dst.attrs[key] = value
+            for name, item in src.items():
+                if name in _DYNAMIC_GROUPS:
+                    group = dst.create_group(name)
+                    for key, value in item.attrs.items():
+                        group.attrs[key] = value
+                    for obj_name, obj in item.items():
+                        if not hasattr(obj, "attrs") or "birthStamp" not in obj.attrs or (name, obj_name) in keep:
+                            src.copy(obj, group, obj_name)
+                else:
+                    src.copy(item, dst, name)
+        return omega_format.ReferenceRecording.from_hdf5(filename=reduced_file)
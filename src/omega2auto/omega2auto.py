@@ -1,45 +1,204 @@
+# Note: heavy dependencies (pyauto, owlready2, omega_format, shapely) and the converter modules are imported lazily on
+# first use, such that importing this module (e.g. in short-lived worker processes) stays fast.
+from __future__ import annotations
+
+import collections
+import concurrent.futures
+import importlib
+import logging
 import math
 import os
+import shutil
 import tempfile
+import time
+from typing import TYPE_CHECKING
 
 import numpy as np
-import pyauto.visualizer.visualizer
-from pyauto import auto
-from pyauto.models.scenario import Scenario
-from pyauto.models.scene import Scene
-from pyauto.models.scenery import Scenery
-
-import omega_format
-from omega2auto.converter_functions.utils import *
-from omega2auto.converter_functions.dynamics.road_user import *
-from omega2auto.converter_functions.dynamics.misc_object import *
-from omega2auto.converter_functions.weather.weather import *
-from omega2auto.converter_functions.road.road import *
-from omega2auto.converter_functions.road.road_object import *
-from omega2auto.converter_functions.road.sign import *
-from omega2auto.converter_functions.road.state import *
-from omega2auto.converter_functions.road.boundary import *
-from omega2auto.converter_functions.road.structural_object import *
-from omega2auto.converter_functions.road.flat_marking import *
-from omega2auto.converter_functions.road.lane import *
-from omega2auto.converter_functions.road.lateral_marking import *
+
+from omega2auto import export, instrumentation, result_cache, scenery_cache
+from omega2auto.activity_index import ActivityIndex
+
+if TYPE_CHECKING:
+    import omega_format
+    from pyauto.models.scenario import Scenario
+    from pyauto.models.scenery import Scenery
 
 # Logging
 logger = logging.getLogger(__name__)
 
+# Modules monkey-patching the to_auto functions into the OMEGA classes
+_CONVERTER_MODULES = ["dynamics.road_user", "dynamics.misc_object", "weather.weather", "road.road", "road.road_object",
+                      "road.sign", "road.state", "road.boundary", "road.structural_object", "road.flat_marking",
+                      "road.lane", "road.lateral_marking"]
+_converter_utils = None
+
+
+def _load_converters():
+    """
+    Imports all converter modules on first use, which registers their to_auto functions with the OMEGA classes.
+    :return: The omega2auto.converter_functions.utils module.
+    """
+    global _converter_utils
+    if _converter_utils is None:
+        for module in _CONVERTER_MODULES:
+            importlib.import_module("omega2auto.converter_functions." + module)
+        _converter_utils = importlib.import_module("omega2auto.converter_functions.utils")
+    return _converter_utils
+
 
-def _load_hdf5(omega_file="inD.hdf5"):
+def _load_hdf5(omega_file="inD.hdf5", lazy=False, scenarios=None, max_scenario_duration=None):
     """
     Loads OMEGA HDF5 from the given file location.
     :param omega_file: The path to the OMEGA HDF5 file.
-    :return: The ReferenceRecording instance.
+    :param lazy: If True, an index of the file is read first to decide which snippets qualify (given scenarios and
+        max_scenario_duration) and only the dynamic objects needed for these snippets are loaded. Falls back to loading
+        the complete file if the file can not be indexed.
+    :param scenarios: An optional list of scenario IDs (only used if lazy).
+    :param max_scenario_duration: The maximum duration (in s) of a scenario (only used if lazy).
+    :return: The ReferenceRecording instance, or None if lazy and no snippet qualifies.
     """
-    logger.debug("Loading OMEGA file " + str(omega_file))
+    if lazy:
+        from omega2auto import lazy_hdf5
+        try:
+            index = lazy_hdf5.read_index(omega_file)
+            ids = scenarios if scenarios is not None else index.get_snippet_tp_ids()
+            ids, _ = _select_snippet_ids(index, ids, max_scenario_duration)
+            if len(ids) == 0:
+                logger.debug("No snippet of OMEGA file %s qualifies", omega_file)
+                return None
+            return lazy_hdf5.load_window(index, *index.get_window(ids))
+        except (KeyError, OSError, ValueError) as e:
+            logger.warning("Could not load OMEGA file %s lazily (%s), loading it completely", omega_file, e)
+    import omega_format
+    logger.debug("Loading OMEGA file %s", omega_file)
     rr = omega_format.ReferenceRecording.from_hdf5(filename=omega_file)
     logger.debug("Finished loading OMEGA file")
     return rr
 
 
+def _select_snippet_ids(rr: omega_format.ReferenceRecording, scenarios=None, max_scenario_duration=None):
+    """
+    Decides which snippets qualify for conversion before extracting them, based on the birth and end frames of the road
+    users that become the snippets' ego vehicles (a snippet spans exactly the lifetime of its ego vehicle).
+    :param rr: The reference recording.
+    :param scenarios: An optional list of scenario IDs (as names of the road users) which shall be selected.
+    :param max_scenario_duration: The maximum duration (in s) of a scenario.
+    :return: A tuple of the list of IDs of the qualifying snippets (or the given scenarios if no pre-selection is
+        possible) and the number of skipped snippets.
+    """
+    if max_scenario_duration is None:
+        return scenarios, 0
+    ids = scenarios
+    if ids is None:
+        if not hasattr(rr, "get_snippet_tp_ids"):
+            return scenarios, 0
+        ids = rr.get_snippet_tp_ids()
+    timestamps = np.asarray(rr.timestamps.val, dtype=float)
+    durations = []
+    for i in ids:
+        if i == getattr(rr, "ego_id", None):
+            durations.append(timestamps[-1] - timestamps[0])
+        elif i in rr.road_users:
+            durations.append(timestamps[rr.road_users[i].end] - timestamps[rr.road_users[i].birth])
+        else:
+            # Unknown IDs are left to the extraction to complain about
+            durations.append(-np.inf)
+    qualifies = np.asarray(durations, dtype=float) <= max_scenario_duration
+    return [i for i, q in zip(ids, qualifies) if q], int(np.count_nonzero(~qualifies))
+
+
+# Attributes in which the converters keep the state of the previously converted frame (on-change and delta modes)
+_FRAME_STATE_ATTRIBUTES = ["last_light_frame", "last_state_segment", "last_weather_run"]
+
+
+def _reset_frame_state(rr: omega_format.ReferenceRecording):
+    """
+    Forgets the state of the previously converted frame kept on the OMEGA objects of the given reference recording,
+    such that a new conversion of it (e.g. with other offsets) starts as if no frame has been converted before.
+    :param rr: The reference recording.
+    """
+    objects = list(rr.road_users.values()) + list(rr.states.values()) + [rr.ego_vehicle, rr.weather]
+    for obj in objects:
+        for name in _FRAME_STATE_ATTRIBUTES:
+            if getattr(obj, name, None) is not None:
+                setattr(obj, name, None)
+
+
+def _release_snippet(rr: omega_format.ReferenceRecording):
+    """
+    Removes the references from the OMEGA objects of the given snippet to the OWL individuals they have been converted
+    to (last_owl_instance and the owl_ attributes) and the state of the previously converted frame. The worlds of the
+    snippet can then be garbage-collected once its scenario is released, even if the OMEGA objects (e.g. the road
+    network) are shared with other snippets or the recording.
+    :param rr: The reference recording of the snippet.
+    """
+    stack = [rr]
+    visited = set()
+    while len(stack) > 0:
+        obj = stack.pop()
+        if id(obj) in visited:
+            continue
+        visited.add(id(obj))
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+            attributes = vars(obj)
+            for name in [k for k in attributes if k.startswith("owl_") or k == "last_owl_instance" or
+                         k in _FRAME_STATE_ATTRIBUTES]:
+                del attributes[name]
+            stack.extend(attributes.values())
+
+
+def _resume_frame_state(rr: omega_format.ReferenceRecording, previous_scene_numbers, scene_number: int,
+                        scene_factory, lights_on_change=False, weather_delta=False, states_on_change=False):
+    """
+    Restores the state of the previously converted frame kept on the OMEGA objects (on-change and delta modes) as if
+    the given frames had been converted right before the given one, such that a chunk of frames converted in another
+    process (see _convert_scene_chunks(...)) continues exactly where the preceding chunk ended.
+    :param rr: The reference recording.
+    :param previous_scene_numbers: The sorted array of frames converted before (non-empty).
+    :param scene_number: The number of the next frame to convert.
+    :param scene_factory: A function creating a scene for a given frame number, used to restore the weather delta.
+    :param lights_on_change: Whether lamp individuals are only created if the light's state has changed.
+    :param weather_delta: Whether the environment is only described if the weather has changed.
+    :param states_on_change: Whether traffic light states are only created if the state has changed.
+    """
+    _load_converters()
+    from omega2auto.converter_functions.dynamics import road_user as road_user_converter
+    from omega2auto.converter_functions.road import state as state_converter
+    from omega2auto.converter_functions.weather import weather as weather_converter
+    previous = int(previous_scene_numbers[-1])
+    if lights_on_change:
+        road_users = list(rr.road_users.values()) + ([rr.ego_vehicle] if rr.ego_vehicle is not None else [])
+        for road_user in road_users:
+            road_user_converter.set_last_light_frame(road_user, previous)
+    if states_on_change:
+        for state in rr.states.values():
+            state_converter.set_last_state_segment(state, previous)
+    if weather_delta and rr.weather is not None:
+        weather_converter.resume_delta(rr.weather, previous_scene_numbers, scene_number, scene_factory)
+
+
+def _create_scene(t: float, scenery: Scenery, folder="pyauto/auto", cp=False, cache_tbox=False):
+    """
+    Creates an empty scene referring to the given scenery.
+    :param t: The timestamp of the scene (in s).
+    :param scenery: The scenery of the scene.
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies (needed for criticality inference).
+    :param cache_tbox: Whether to clone the TBox of the scene from a process-wide cache.
+    :return: The scene.
+    """
+    # Note: already passing scenery here. If we do it later, we might create clashes with individual names.
+    if cache_tbox:
+        from omega2auto import tbox_cache
+        return tbox_cache.create_scene(float(t), folder, cp, scenery)
+    from pyauto.models.scene import Scene
+    return Scene(timestamp=float(t), folder=folder, load_cp=cp, scenery=scenery)
+
+
 def _add_identity_information(instance_tuples):
     """
     Stores the last OWL instance of the given reference recording instance.
@@ -77,18 +236,69 @@ def _get_speed_limit(rr: omega_format.ReferenceRecording) -> int or None:
     return None
 
 
-def _to_auto(rr: omega_format.ReferenceRecording, hertz: int = None, start_offset=0, end_offset=0,
-             folder="pyauto/auto", cp=False) -> Scenario:
+def _convert_scenery(rr: omega_format.ReferenceRecording, folder="pyauto/auto", cp=False, cache_tbox=False,
+                     cache_folder=None, wkt_precision=-1, exporter=None, instr=instrumentation.DISABLED) -> Scenery:
     """
-    Main converter function - converts all instances within the reference recording to A.U.T.O. instances. Uses the
-    monkey-patched converter functions.
-    :param rr: The reference recording to convert from.
-    :param hertz: An optional sampling rate (so that recordings can be down sampled when loading into A.U.T.O.)
-        Note: The recording's sampling rate *has* to be a multiple of this sampling rate, if given.
-    :param start_offset: The offset to start sampling the scenarios from (in s).
-    :param end_offset: The offset to end sampling the scenarios from (in s).
+    Converts the road network of the reference recording into a scenery. If a cache folder is given, the scenery is
+    loaded from there if a scenery of the same road network has already been converted before, and stored there
+    otherwise.
+    :param rr: The reference recording to convert the road network from.
     :param folder: The path to the folder in which A.U.T.O. is located.
     :param cp: Whether to also load the two criticality phenomena ontologies (needed for criticality inference).
+    :param cache_tbox: Whether to clone the TBox of the scenery from a process-wide cache.
+    :param cache_folder: An optional path to the folder of the persistent scenery cache.
+    :param wkt_precision: The precision of WKT serializations (only used for the cache key, needs to be set in utils).
+    :param exporter: An optional export.ScenarioExporter, which is told where the scenery's TBox ends.
+    :param instr: The instrumentation to record counters to.
+    :return: The converted scenery.
+    """
+    utils = _load_converters()
+
+    def create_scenery():
+        if cache_tbox:
+            from omega2auto import tbox_cache
+            scenery = tbox_cache.create_scenery(folder, cp)
+        else:
+            from pyauto.models.scenery import Scenery
+            scenery = Scenery(load_cp=cp, folder=folder)
+        if exporter is not None:
+            exporter.begin(scenery)
+        return scenery
+
+    cached = None
+    if cache_folder is not None:
+        key, road_network = scenery_cache.fingerprint(rr, cp, wkt_precision)
+        cached = scenery_cache.load(cache_folder, key, road_network, create_scenery)
+    if cached is not None:
+        scenery, converted_rr_scenery_entities = cached
+        _add_identity_information(converted_rr_scenery_entities)
+        utils.index_scenery_individuals(scenery, converted_rr_scenery_entities)
+        scenery.converted_entity_ids = {id(x) for x, _ in converted_rr_scenery_entities}
+    else:
+        logger.debug("Converting %d roads", len(rr.roads.values()))
+        scenery = create_scenery()
+        triples = instr.triples(scenery)
+        converted_rr_scenery_entities = []
+        for i, road in enumerate(rr.roads.values()):
+            converted_rr_scenery_entities += road.to_auto(scenery, i)
+        _add_identity_information(converted_rr_scenery_entities)
+        scenery.converted_entity_ids = {id(x) for x, _ in converted_rr_scenery_entities}
+        utils.instantiate_pending_relations(converted_ids=[scenery.converted_entity_ids])
+        instr.count_individuals(converted_rr_scenery_entities)
+        instr.count("triples.scenery", instr.triples(scenery) - triples)
+        if cache_folder is not None:
+            scenery_cache.save(cache_folder, key, road_network, scenery, converted_rr_scenery_entities)
+    return scenery
+
+
+def _get_scene_numbers(rr: omega_format.ReferenceRecording, hertz: int = None, start_offset=0, end_offset=0):
+    """
+    Determines the frames of the reference recording which become scenes.
+    :param rr: The reference recording.
+    :param hertz: An optional sampling rate (see _to_auto(...)).
+    :param start_offset: The offset to start sampling the scenarios from (in s).
+    :param end_offset: The offset to end sampling the scenarios from (in s).
+    :return: A tuple of the array of frame numbers and the sampling rate of the recording.
     """
     snippet_start = rr.timestamps.val[0] + start_offset
     snippet_end = rr.timestamps.val[-1] - end_offset
@@ -99,89 +309,543 @@ def _to_auto(rr: omega_format.ReferenceRecording, hertz: int = None, start_offse
     rr_hz = int(1 / (rr.timestamps.val[1] - rr.timestamps.val[0]))
     if not hertz:
         hertz = rr_hz
+    logger.debug("Loading scenario from %ss - %ss", snippet_start, snippet_end)
+    return np.arange(snippet_start * rr_hz, snippet_end * rr_hz, round(rr_hz / hertz)), rr_hz
 
-    logger.debug("Loading scenario from " + str(str(snippet_start)) + "s - " + str(str(snippet_end)) + "s")
-
-    speed_limit = _get_speed_limit(rr)
 
-    # Convert static infrastructure
-    logger.debug("Converting " + str(len(rr.roads.values())) + " roads")
-    scenery = Scenery(load_cp=cp, folder=folder)
-    converted_rr_scenery_entities = []
-    for i, road in enumerate(rr.roads.values()):
-        converted_rr_scenery_entities += road.to_auto(scenery, i)
-    _add_identity_information(converted_rr_scenery_entities)
-    for rr_inst in converted_rr_scenery_entities:
-        instantiate_relations(rr_inst[0])
+def _convert_scenes(rr: omega_format.ReferenceRecording, scenery: Scenery, scene_numbers, rr_hz: int,
+                    folder="pyauto/auto", cp=False, cache_tbox=False, lights_on_change=False, weather_delta=False,
+                    states_on_change=False, bulk_triples=False, exporter=None,
+                    instr=instrumentation.DISABLED) -> list:
+    """
+    Converts the given frames of the reference recording into scenes referring to the given scenery. Frames are
+    converted in order, as the on-change modes and the last_owl_instance information depend on the previous frame.
+    :param rr: The reference recording to convert from.
+    :param scenery: The converted scenery of the reference recording.
+    :param scene_numbers: The sorted array of frame numbers to convert.
+    :param rr_hz: The sampling rate of the reference recording.
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies (needed for criticality inference).
+    :param cache_tbox: Whether to clone the TBox of each scene from a process-wide cache.
+    :param lights_on_change: Whether to create lamp individuals only in scenes in which the light's state has changed.
+    :param weather_delta: Whether to describe the environment only in scenes in which the weather has changed.
+    :param states_on_change: Whether to create traffic light states only in scenes in which the state has changed.
+    :param bulk_triples: Whether to insert the data properties of road users and misc objects in bulk per scene.
+    :param exporter: An optional export.ScenarioExporter. If given, each scene is exported right after its conversion
+        and released afterwards.
+    :param instr: The instrumentation to record per-stage timings and counters to.
+    :return: The list of converted scenes (or the paths to the exported scenes, if an exporter is given).
+    """
+    utils = _load_converters()
 
+    speed_limit = _get_speed_limit(rr)
     scenes = []
-    scene_numbers = np.arange(snippet_start * rr_hz, snippet_end * rr_hz, round(rr_hz / hertz))
-    for iteration, scene_number in enumerate(scene_numbers):
+    scene_construction_time = 0
+    # Activity of road users and misc objects is looked up from indices which are built once per snippet
+    road_users_sweep = ActivityIndex(rr.road_users).sweep(scene_numbers)
+    misc_objects_sweep = ActivityIndex(rr.misc_objects).sweep(scene_numbers)
+    for iteration, (scene_number, (_, _, _, road_users_s), (_, _, _, misc_objects_s)) in \
+            enumerate(zip(scene_numbers, road_users_sweep, misc_objects_sweep)):
         scene_number = int(scene_number)
         t = scene_number / rr_hz
 
-        logger.debug("Scene " + str(iteration + 1) + " (" + str(t) + "s, #" + str(scene_number) + ") / " +
-                     str(len(scene_numbers)))
+        logger.debug("Scene %d (%ss, #%d) / %d", iteration + 1, t, scene_number, len(scene_numbers))
 
-        # Note: already passing scenery here. If we do it later, we might create clashes with individual names.
-        scene = Scene(timestamp=float(t), folder=folder, load_cp=cp, scenery=scenery)
+        scene_construction_start = time.perf_counter()
+        scene = _create_scene(t, scenery, folder, cp, cache_tbox)
+        scene_construction_duration = time.perf_counter() - scene_construction_start
+        scene_construction_time += scene_construction_duration
+        instr.add_time("scene_construction", scene_construction_duration)
         scenes.append(scene)
+        if exporter is not None:
+            exporter.begin(scene)
         scene.has_speed_limit = speed_limit
+        if bulk_triples:
+            utils.enable_bulk_triples(scene)
 
         converted_rr_entities = []
 
         # Convert road users and ego vehicle
-        road_users_s = [x for x in {k: v for k, v in rr.road_users.items()}.items() if
-                        x[1].birth <= scene_number <= x[1].end]
-        if rr.ego_vehicle is not None and rr.ego_vehicle.birth <= scene_number <= rr.ego_vehicle.end:
-            road_users_s.append((rr.ego_vehicle.id, rr.ego_vehicle))
-        logger.debug("Converting " + str(len(road_users_s)) + " road users")
-        for i, road_user in road_users_s:
-            user_instances = road_user.to_auto(scene, scene_number, i)
-            converted_rr_entities += user_instances
-            road_user.owl_entity = user_instances
+        with instr.time("road_users"):
+            triples = instr.triples(scene)
+            if rr.ego_vehicle is not None and rr.ego_vehicle.birth <= scene_number <= rr.ego_vehicle.end:
+                road_users_s.append((rr.ego_vehicle.id, rr.ego_vehicle))
+            logger.debug("Converting %d road users", len(road_users_s))
+            for i, road_user in road_users_s:
+                user_instances = road_user.to_auto(scene, scene_number, i, lights_on_change=lights_on_change)
+                converted_rr_entities += user_instances
+                road_user.owl_entity = user_instances
+            utils.flush_triples(scene)
+            instr.count("triples.RoadUser", instr.triples(scene) - triples)
 
         # Convert misc objects
-        misc_objects_s = [x for x in {k: v for k, v in rr.misc_objects.items()}.items() if
-                          x[1].birth <= scene_number <= x[1].end]
-        logger.debug("Converting " + str(len(misc_objects_s)) + " misc entities")
-        for i, misc in misc_objects_s:
-            misc_instances = misc.to_auto(scene, scene_number, i)
-            converted_rr_entities += misc_instances
+        with instr.time("misc_objects"):
+            triples = instr.triples(scene)
+            logger.debug("Converting %d misc entities", len(misc_objects_s))
+            for i, misc in misc_objects_s:
+                misc_instances = misc.to_auto(scene, scene_number, i)
+                converted_rr_entities += misc_instances
+            utils.flush_triples(scene)
+            instr.count("triples.MiscObject", instr.triples(scene) - triples)
 
         # Convert traffic sign states
-        logger.debug("Converting " + str(len(rr.states.values())) + " traffic sign states")
-        for traffic_sign_state in rr.states.values():
-            state_s = traffic_sign_state.values[scene_number]
-            state_instances = state_s.to_auto(scene, scene_number)
-            converted_rr_entities += state_instances
+        with instr.time("states"):
+            triples = instr.triples(scene)
+            logger.debug("Converting %d traffic sign states", len(rr.states.values()))
+            for state in rr.states.values():
+                state_instances = state.to_auto(scene, scene_number, on_change=states_on_change)
+                converted_rr_entities += state_instances
+            instr.count("triples.State", instr.triples(scene) - triples)
 
         # Convert weather
-        if rr.weather is not None:
-            logger.debug("Converting weather")
-            weather_instances = rr.weather.to_auto(scene, scene_number)
-            converted_rr_entities += weather_instances
-        else:
-            logger.debug("No weather information present in recording")
-
-        # Convert sign states
-        for sign_state in rr.states.values():
-            sign_state.to_auto(scene, scene_number)
+        with instr.time("weather"):
+            triples = instr.triples(scene)
+            if rr.weather is not None:
+                logger.debug("Converting weather")
+                weather_instances = rr.weather.to_auto(scene, scene_number, delta=weather_delta)
+                converted_rr_entities += weather_instances
+                instr.count("individuals_saved.Weather", rr.weather.last_saved_individuals)
+            else:
+                logger.debug("No weather information present in recording")
+            instr.count("triples.Weather", instr.triples(scene) - triples)
 
         # Update last_owl_instance information
         _add_identity_information(converted_rr_entities)
+        instr.count_individuals(converted_rr_entities)
 
         # Final step: Set references to relations correctly (also for scenery: new entities may point to scenery
-        # elements)
-        for rr_inst in converted_rr_entities + converted_rr_scenery_entities:
-            instantiate_relations(rr_inst[0])
+        # elements). Only entities that received deferred relations are visited.
+        with instr.time("relations"):
+            resolved = utils.instantiate_pending_relations(
+                [scene, scenery], [{id(x) for x, _ in converted_rr_entities}, scenery.converted_entity_ids])
+        instr.count("relations.resolved_entities", resolved)
+        logger.debug("Instantiated pending relations of %d entities", resolved)
+
+        if exporter is not None:
+            with instr.time("export"):
+                scenes[-1] = exporter.export_scene(scene, scenery)
+            # Relations still pending can not end up in the exported file anymore. The scene's world is closed, as the
+            # OMEGA objects keep references to its individuals (e.g. last_owl_instance) until they appear again.
+            dropped = utils.clear_pending_relations()
+            if dropped > 0:
+                logger.warning("Dropping %d relations to objects not converted in scene %d", dropped, scene_number)
+            instr.count("relations.dropped", dropped)
+            scene.close()
+
+    instr.count("scenes", len(scenes))
+    if len(scenes) > 0:
+        logger.debug("Constructed %d scenes in %.3fs (%.1fms per scene, TBox cache %s)", len(scenes),
+                     scene_construction_time, 1000 * scene_construction_time / len(scenes),
+                     "enabled" if cache_tbox else "disabled")
+    return scenes
 
+
+def _to_auto(rr: omega_format.ReferenceRecording, hertz: int = None, start_offset=0, end_offset=0,
+             folder="pyauto/auto", cp=False, cache_tbox=False, scenery_cache_folder=None, lights_on_change=False,
+             weather_delta=False, states_on_change=False, wkt_precision=-1, bulk_triples=False, export_format=None,
+             export_compress=False, export_prefix=None, scene_numbers=None, previous_scene_numbers=None,
+             exporter=None, instr=instrumentation.DISABLED) -> Scenario or str or list:
+    """
+    Main converter function - converts all instances within the reference recording to A.U.T.O. instances. Uses the
+    monkey-patched converter functions.
+    :param rr: The reference recording to convert from.
+    :param hertz: An optional sampling rate (so that recordings can be down sampled when loading into A.U.T.O.)
+        Note: The recording's sampling rate *has* to be a multiple of this sampling rate, if given.
+    :param start_offset: The offset to start sampling the scenarios from (in s).
+    :param end_offset: The offset to end sampling the scenarios from (in s).
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies (needed for criticality inference).
+    :param cache_tbox: Whether to clone the TBox of each scene and the scenery from a process-wide cache instead of
+        loading the A.U.T.O. ontologies from the folder again.
+    :param scenery_cache_folder: An optional path to a folder in which converted sceneries are cached by the content of
+        their road network.
+    :param lights_on_change: Whether to create lamp individuals of road users only in scenes in which the light's state
+        has changed.
+    :param weather_delta: Whether to describe the environment only in scenes in which the weather has changed.
+    :param states_on_change: Whether to create traffic light states only in scenes in which the state has changed.
+    :param wkt_precision: The number of decimal places of coordinates in WKT serializations (-1 for full precision).
+    :param bulk_triples: Whether to insert the data properties of road users and misc objects in bulk per scene instead
+        of through owlready2's property setters.
+    :param export_format: An optional format ("nt" or "ttl") to stream the scenes to files in right after their
+        conversion instead of returning a scenario (only used if export_prefix is given).
+    :param export_compress: Whether to gzip-compress the exported files.
+    :param export_prefix: The path prefix of the exported files (see export.ScenarioExporter).
+    :param scene_numbers: An optional array of frame numbers to convert (e.g. a chunk of the frames of a snippet). By
+        default, all frames determined by hertz, start_offset and end_offset are converted.
+    :param previous_scene_numbers: An optional array of the frames converted right before scene_numbers (e.g. by
+        another process converting the preceding chunk). The state of the on-change and delta modes is restored as if
+        these frames had been converted in this process.
+    :param exporter: An optional export.ScenarioExporter to export the scenes with (instead of creating one from
+        export_format and export_prefix). Exporting the scenery and writing the .kbs file is then left to the caller.
+    :param instr: The instrumentation to record per-stage timings and counters to.
+    :return: The scenario, or the path to the .kbs file of the exported scenes if exporting, or the list of paths to
+        the exported scenes if an exporter is given.
+    """
+    from pyauto.models.scenario import Scenario
+    utils = _load_converters()
+
+    own_exporter = exporter is None and export_format is not None and export_prefix is not None
+    if own_exporter:
+        exporter = export.ScenarioExporter(export_prefix, export_format, export_compress)
+    all_scene_numbers, rr_hz = _get_scene_numbers(rr, hertz, start_offset, end_offset)
+    if scene_numbers is None:
+        scene_numbers = all_scene_numbers
+
+    _reset_frame_state(rr)
+
+    # Convert static infrastructure
+    utils.set_wkt_precision(wkt_precision)
+    utils.clear_pending_relations()
+    with instr.time("scenery"):
+        scenery = _convert_scenery(rr, folder=folder, cp=cp, cache_tbox=cache_tbox, cache_folder=scenery_cache_folder,
+                                   wkt_precision=wkt_precision, exporter=exporter, instr=instr)
+        utils.get_driveable_lanes_index(scenery)
+
+    if previous_scene_numbers is not None and len(previous_scene_numbers) > 0 and len(scene_numbers) > 0:
+        _resume_frame_state(rr, previous_scene_numbers, int(scene_numbers[0]),
+                            lambda n: _create_scene(n / rr_hz, scenery, folder, cp, cache_tbox),
+                            lights_on_change=lights_on_change, weather_delta=weather_delta,
+                            states_on_change=states_on_change)
+
+    scenes = _convert_scenes(rr, scenery, scene_numbers, rr_hz, folder=folder, cp=cp, cache_tbox=cache_tbox,
+                             lights_on_change=lights_on_change, weather_delta=weather_delta,
+                             states_on_change=states_on_change, bulk_triples=bulk_triples, exporter=exporter,
+                             instr=instr)
     logger.debug("Finished converting OMEGA to OWL")
+    if exporter is not None and not own_exporter:
+        return scenes
+    if exporter is not None:
+        with instr.time("export"):
+            exporter.export_scenery(scenery)
+            return exporter.finish()
     return Scenario(scenes=scenes, scenery=scenery, folder=folder, load_cp=cp)
 
 
+def _convert_snippet(i, rr, save_folder, to_auto_args: dict, instrumented=False, scene_workers=None):
+    """
+    Converts a single OMEGA snippet. Used as the unit of work for both sequential and parallel conversion, therefore it
+    is a module-level function that can be pickled and sent to worker processes, where it builds its own owlready2
+    worlds.
+    :param i: The index of the snippet within the list of extracted snippets.
+    :param rr: The reference recording of the snippet.
+    :param save_folder: If given, the scenario is saved into this folder and the path to its OWL file is returned
+        instead of the scenario itself.
+    :param to_auto_args: The keyword arguments passed to _to_auto(...).
+    :param instrumented: Whether to record timings and counters of the conversion.
+    :param scene_workers: The number of worker processes to convert contiguous chunks of the snippet's scenes in
+        parallel (requires save_folder, see _convert_scene_chunks(...)).
+    :return: A tuple of the converted scenario (or, if save_folder is given, the path to the saved scenario or to the
+        .kbs file of the exported or scene-parallel converted scenario) and the summary of the instrumentation (or None
+        if not instrumented).
+    """
+    if scene_workers is not None and scene_workers > 1:
+        if save_folder is not None:
+            return _convert_scene_chunks(i, rr, save_folder, to_auto_args, scene_workers, instrumented)
+        logger.warning("Scene-parallel conversion requires a save folder, converting scenes sequentially")
+    instr = instrumentation.Instrumentation() if instrumented else instrumentation.DISABLED
+    if save_folder is not None and to_auto_args.get("export_format") is not None:
+        # Scenes are exported during conversion, the path to the .kbs file is returned
+        scenario = _to_auto(rr, export_prefix=os.path.join(save_folder, "scenario_" + str(i)), instr=instr,
+                            **to_auto_args)
+        return scenario, instr.summary() if instrumented else None
+    scenario = _to_auto(rr, instr=instr, **to_auto_args)
+    if save_folder is not None:
+        with instr.time("save"):
+            file = os.path.join(save_folder, "scenario_" + str(i) + ".owl")
+            scenario.save_abox(file)
+        scenario = file
+    return scenario, instr.summary() if instrumented else None
+
+
+def _convert_scene_chunk(i, k, save_folder, rr, scene_numbers, previous_scene_numbers, to_auto_args: dict,
+                         first_scene=0, instrumented=False):
+    """
+    Converts a contiguous chunk of the frames of a snippet. Runs in a worker process of _convert_scene_chunks(...),
+    which has stored the snippet's scenery in the scenery cache given in to_auto_args beforehand.
+    :param i: The index of the snippet within the list of extracted snippets.
+    :param k: The index of the chunk.
+    :param save_folder: The folder in which the chunk is saved.
+    :param rr: The reference recording of the snippet.
+    :param scene_numbers: The frame numbers of the chunk.
+    :param previous_scene_numbers: The frame numbers of all preceding chunks.
+    :param to_auto_args: The keyword arguments passed to _to_auto(...).
+    :param first_scene: The index of the first scene of the chunk within the snippet (used to name exported scenes).
+    :param instrumented: Whether to record timings and counters of the conversion.
+    :return: A tuple of the path to the .kbs file of the saved chunk (or, if exporting, the list of paths to the
+        exported scenes) and the summary of the instrumentation (or None if not instrumented).
+    """
+    instr = instrumentation.Instrumentation() if instrumented else instrumentation.DISABLED
+    if to_auto_args.get("export_format") is not None:
+        exporter = export.ScenarioExporter(os.path.join(save_folder, "scenario_" + str(i)),
+                                           to_auto_args["export_format"], to_auto_args.get("export_compress", False),
+                                           first_scene=first_scene)
+        files = _to_auto(rr, scene_numbers=scene_numbers, previous_scene_numbers=previous_scene_numbers,
+                         exporter=exporter, instr=instr, **to_auto_args)
+        return files, instr.summary() if instrumented else None
+    scenario = _to_auto(rr, scene_numbers=scene_numbers, previous_scene_numbers=previous_scene_numbers, instr=instr,
+                        **to_auto_args)
+    file = os.path.join(save_folder, "scenario_%d_%d.owl" % (i, k))
+    with instr.time("save"):
+        scenario.save_abox(file)
+    return os.path.splitext(file)[0] + ".kbs", instr.summary() if instrumented else None
+
+
+def _convert_chunk_scenery(rr, to_auto_args: dict, exporter=None, instrumented=False):
+    """
+    Converts the scenery of a snippet and stores it in the scenery cache given in to_auto_args, from which the workers
+    of _convert_scene_chunks(...) load it. Runs in a worker process.
+    :param rr: The reference recording of the snippet.
+    :param to_auto_args: The keyword arguments passed to _to_auto(...).
+    :param exporter: An optional export.ScenarioExporter to export the scenery with.
+    :param instrumented: Whether to record timings and counters of the conversion.
+    :return: A tuple of the path to the exported scenery (or None if not exporting) and the summary of the
+        instrumentation (or None if not instrumented).
+    """
+    instr = instrumentation.Instrumentation() if instrumented else instrumentation.DISABLED
+    utils = _load_converters()
+    wkt_precision = to_auto_args.get("wkt_precision", -1)
+    utils.set_wkt_precision(wkt_precision)
+    utils.clear_pending_relations()
+    with instr.time("scenery"):
+        scenery = _convert_scenery(rr, folder=to_auto_args.get("folder", "pyauto/auto"),
+                                   cp=to_auto_args.get("cp", False), cache_tbox=to_auto_args.get("cache_tbox", False),
+                                   cache_folder=to_auto_args["scenery_cache_folder"], wkt_precision=wkt_precision,
+                                   exporter=exporter, instr=instr)
+    scenery_file = None
+    if exporter is not None:
+        with instr.time("export"):
+            scenery_file = exporter.export_scenery(scenery)
+    return scenery_file, instr.summary() if instrumented else None
+
+
+def _convert_scene_chunks(i, rr, save_folder, to_auto_args: dict, scene_workers: int, instrumented=False):
+    """
+    Converts a single (long) OMEGA snippet by partitioning its frames into contiguous chunks which are converted in
+    parallel worker processes. The scenery is converted once (see _convert_chunk_scenery(...)) and stored in the
+    scenery cache (the one given in to_auto_args, or a temporary one in save_folder), from which every worker loads it,
+    such that the scenes of all chunks refer to the same scenery individuals. Each worker restores the state of the
+    on-change and delta modes from the frames preceding its chunk (see _resume_frame_state(...)), i.e. its first scene
+    is converted exactly like in a sequential conversion of the snippet.
+    Without export, each chunk is saved as scenario_<i>_<k>.owl (with a copy of the shared scenery) and the chunks'
+    .kbs files are concatenated in order into scenario_<i>.kbs. If exporting, the scenery is exported once as
+    scenario_<i>_scenery.nt, the scenes are numbered across all chunks and scenario_<i>.kbs lists them like a sequential
+    export of the snippet.
+    :param i: The index of the snippet within the list of extracted snippets.
+    :param rr: The reference recording of the snippet.
+    :param save_folder: The folder in which the chunks and the stitched .kbs file are saved.
+    :param to_auto_args: The keyword arguments passed to _to_auto(...).
+    :param scene_workers: The number of worker processes (and chunks).
+    :param instrumented: Whether to record timings and counters of the conversion.
+    :return: A tuple of the path to the .kbs file of the snippet and the merged summary of the instrumentation of all
+        chunks (or None if not instrumented).
+    """
+    scene_numbers, _ = _get_scene_numbers(rr, to_auto_args.get("hertz"), to_auto_args.get("start_offset", 0),
+                                          to_auto_args.get("end_offset", 0))
+    chunks = [c for c in np.array_split(scene_numbers, min(scene_workers, max(1, len(scene_numbers)))) if len(c) > 0]
+    starts = np.cumsum([0] + [len(c) for c in chunks[:-1]])
+    logger.debug("Converting %d scenes of snippet %d in %d chunks", len(scene_numbers), i, len(chunks))
+    instr = instrumentation.Instrumentation() if instrumented else instrumentation.DISABLED
+    kbs_file = os.path.join(save_folder, "scenario_" + str(i) + ".kbs")
+    exporter = None
+    if to_auto_args.get("export_format") is not None:
+        exporter = export.ScenarioExporter(os.path.splitext(kbs_file)[0], to_auto_args["export_format"],
+                                           to_auto_args.get("export_compress", False))
+    cache_folder = to_auto_args.get("scenery_cache_folder")
+    tmp_cache_folder = None
+    if cache_folder is None:
+        tmp_cache_folder = cache_folder = tempfile.mkdtemp(prefix=".scenario_%d_scenery." % i, dir=save_folder)
+    chunk_args = dict(to_auto_args, scenery_cache_folder=cache_folder)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            # The scenery is converted by a worker as well, as converting it here would attach OWL individuals to the
+            # OMEGA objects sent to the workers
+            scenery_file, summary = executor.submit(_convert_chunk_scenery, rr, chunk_args, exporter,
+                                                    instrumented).result()
+            if summary is not None:
+                instr.merge(summary)
+            futures = [executor.submit(_convert_scene_chunk, i, k, save_folder, rr, chunk, scene_numbers[:start],
+                                       chunk_args, int(start), instrumented)
+                       for k, (chunk, start) in enumerate(zip(chunks, starts))]
+            chunk_results = []
+            for future in futures:
+                chunk_result, summary = future.result()
+                chunk_results.append(chunk_result)
+                if summary is not None:
+                    instr.merge(summary)
+    finally:
+        if tmp_cache_folder is not None:
+            shutil.rmtree(tmp_cache_folder, ignore_errors=True)
+    with instr.time("stitch"):
+        if exporter is not None:
+            exporter.scenery_file = scenery_file
+            for files in chunk_results:
+                exporter.scene_files.extend(files)
+            exporter.finish()
+        else:
+            with open(kbs_file, "w") as kbs:
+                for chunk_kbs_file in chunk_results:
+                    with open(chunk_kbs_file) as f:
+                        kbs.write(f.read().rstrip("\n") + "\n")
+    return kbs_file, instr.summary() if instrumented else None
+
+
+def iter_convert(omega_file="inD.hdf5", folder="pyauto/auto", cp=False, scenarios=None, hertz=None, start_offset=0,
+                 end_offset=0, max_scenario_duration=None, workers=None, save_folder=None, cache_tbox=False,
+                 scenery_cache_folder=None, lights_on_change=False, weather_delta=False, states_on_change=False,
+                 wkt_precision=-1, lazy_load=False, scene_workers=None, bulk_triples=False, export_format=None,
+                 export_compress=False, result_cache_folder=None, instr=None, callback=None):
+    """
+    Streaming variant of convert(...): yields each scenario as soon as it has been converted instead of accumulating all
+    of them, such that peak memory is bounded by the scenarios currently in conversion (one snippet in sequential mode,
+    at most one per worker in parallel mode). Takes the same parameters as convert(...) and additionally:
+    :param callback: An optional function called with the index of the snippet and the converted scenario (or its path,
+        if save_folder is given), e.g. for saving it. If given, its return value is yielded instead of the scenario,
+        which allows to release the scenario right after its conversion. If result_cache_folder is given, the paths are
+        only yielded (and passed to the callback) once the cache entry has been completed.
+    :return: A generator yielding the scenarios (or paths, or callback results) in the order of the snippets.
+    """
+    if instr is None:
+        instr = instrumentation.DISABLED
+    if start_offset is None:
+        start_offset = 0
+    if end_offset is None:
+        end_offset = 0
+    result_cache_key = None
+    if result_cache_folder is not None:
+        # Only the parameters that influence the converted output are part of the key
+        cache_params = dict(cp=cp, scenarios=scenarios, hertz=hertz, start_offset=start_offset, end_offset=end_offset,
+                            max_scenario_duration=max_scenario_duration, lights_on_change=lights_on_change,
+                            weather_delta=weather_delta, states_on_change=states_on_change,
+                            wkt_precision=wkt_precision, export_format=export_format, export_compress=export_compress)
+        if scene_workers is not None and scene_workers > 1 and export_format is None:
+            # Scene-parallel conversion saves the chunks into separate files (exports are the same as sequential ones)
+            cache_params["scene_workers"] = scene_workers
+        with instr.time("result_cache"):
+            result_cache_key = result_cache.fingerprint(omega_file, cache_params, folder)
+            paths = result_cache.load(result_cache_folder, result_cache_key)
+        if paths is not None:
+            instr.count("result_cache.hits")
+            for i, path in enumerate(paths):
+                yield path if callback is None else callback(i, path)
+            return
+        instr.count("result_cache.misses")
+        if save_folder is not None:
+            logger.warning("Saving scenarios into the result cache instead of %s", save_folder)
+        save_folder = result_cache.prepare(result_cache_folder, result_cache_key)
+    if save_folder is not None:
+        os.makedirs(save_folder, exist_ok=True)
+    elif export_format is not None:
+        logger.warning("Exporting scenes requires a save folder, returning scenarios instead")
+        export_format = None
+    to_auto_args = dict(hertz=hertz, start_offset=start_offset, end_offset=end_offset, folder=folder, cp=cp,
+                        cache_tbox=cache_tbox, scenery_cache_folder=scenery_cache_folder,
+                        lights_on_change=lights_on_change, weather_delta=weather_delta,
+                        states_on_change=states_on_change, wkt_precision=wkt_precision, bulk_triples=bulk_triples,
+                        export_format=export_format, export_compress=export_compress)
+    results = _iter_convert_snippets(omega_file, scenarios, max_scenario_duration, workers, save_folder, lazy_load,
+                                     scene_workers, to_auto_args, instr)
+    if result_cache_key is None:
+        for i, result in results:
+            yield _finish_snippet(i, result, instr, callback)
+        return
+    # The scenarios are saved into a temporary folder which only becomes the cache entry once all snippets are done
+    try:
+        saved = [_finish_snippet(i, result, instr, None) for i, result in results]
+        paths = result_cache.save(result_cache_folder, result_cache_key, save_folder, cache_params, saved)
+    except BaseException:
+        result_cache.discard(save_folder)
+        raise
+    for i, path in enumerate(paths):
+        yield path if callback is None else callback(i, path)
+
+
+def _iter_convert_snippets(omega_file, scenarios, max_scenario_duration, workers, save_folder, lazy_load,
+                           scene_workers, to_auto_args: dict, instr):
+    """
+    Loads the given OMEGA file, extracts its snippets and converts them (see iter_convert(...) for the parameters).
+    :param to_auto_args: The keyword arguments passed to _to_auto(...).
+    :return: A generator yielding tuples of the index of each snippet and the result of _convert_snippet(...), in the
+        order of the snippets.
+    """
+    with instr.time("hdf5_load"):
+        omega_data = _load_hdf5(omega_file, lazy=lazy_load, scenarios=scenarios,
+                                max_scenario_duration=max_scenario_duration)
+    logger.debug("Extracting snippets from OMEGA file")
+    with instr.time("snippet_extraction"):
+        if omega_data is None:
+            omega_snippets = []
+        else:
+            # TODO revert once omega_format master has been updated
+            try:
+                snippet_ids, skipped = _select_snippet_ids(omega_data, scenarios, max_scenario_duration)
+                if skipped > 0:
+                    logger.debug("Skipping %d snippets longer than %ss", skipped, max_scenario_duration)
+                instr.count("snippets_skipped", skipped)
+                if snippet_ids is not None and len(snippet_ids) == 0:
+                    # All snippets were skipped, extract_snippets(ids=[]) would fall back to the whole recording
+                    omega_snippets = []
+                else:
+                    omega_snippets = omega_data.extract_snippets(ids=snippet_ids)
+                if max_scenario_duration is not None and snippet_ids is scenarios:
+                    # Snippets could not be pre-selected, filter them after extraction
+                    omega_snippets = list(filter(
+                        lambda x: (x.timestamps.val[-1] - x.timestamps.val[0]) <= max_scenario_duration,
+                        omega_snippets))
+            except AssertionError:
+                omega_snippets = [omega_data]
+    omega_snippets = collections.deque(omega_snippets)
+    snippets_len = len(omega_snippets)
+    instr.count("snippets", snippets_len)
+    # Scenes of a snippet are converted by a pool of workers, snippets are then converted one after another
+    scene_parallel = scene_workers is not None and scene_workers > 1 and save_folder is not None
+    parallel = workers is not None and workers > 1 and snippets_len > 1 and not scene_parallel
+    if parallel and save_folder is None:
+        # Scenarios are owlready2 worlds backed by SQLite, which can not be sent back from worker processes
+        logger.warning("Parallel conversion requires a save folder, converting snippets sequentially")
+        parallel = False
+    if parallel:
+        logger.debug("Creating OWL worlds for %d snippets using %d workers", snippets_len, workers)
+        workers = min(workers, snippets_len)
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            # Only keeps as many snippets in flight as there are workers, results are yielded in the order of snippets
+            futures = collections.deque()
+            for i in range(snippets_len):
+                rr = omega_snippets.popleft()
+                futures.append((i, executor.submit(_convert_snippet, i, rr, save_folder, to_auto_args,
+                                                   instr.enabled)))
+                if len(futures) >= workers:
+                    j, future = futures.popleft()
+                    yield j, future.result()
+            while len(futures) > 0:
+                j, future = futures.popleft()
+                yield j, future.result()
+    else:
+        for i in range(snippets_len):
+            # Snippets are released one by one, such that only the worlds of the current snippet are referenced here
+            rr = omega_snippets.popleft()
+            logger.debug("Creating OWL worlds for snippet %d/%d", i, snippets_len)
+            yield i, _convert_snippet(i, rr, save_folder, to_auto_args, instr.enabled, scene_workers)
+            _release_snippet(rr)
+
+
+def _finish_snippet(i, result, instr, callback):
+    """
+    Merges the instrumentation summary of the conversion of the i-th snippet and applies the optional callback of
+    iter_convert(...) to its result.
+    """
+    scenario, summary = result
+    if summary is not None:
+        instr.merge(summary)
+    if callback is None:
+        return scenario
+    return callback(i, scenario)
+
+
 def convert(omega_file="inD.hdf5", folder="pyauto/auto", cp=False, scenarios=None, hertz=None, start_offset=0,
-            end_offset=0, max_scenario_duration=None) -> list:
+            end_offset=0, max_scenario_duration=None, workers=None, save_folder=None, cache_tbox=False,
+            scenery_cache_folder=None, lights_on_change=False, weather_delta=False, states_on_change=False,
+            wkt_precision=-1, lazy_load=False, scene_workers=None, bulk_triples=False, export_format=None,
+            export_compress=False, result_cache_folder=None, instr=None) -> list:
     """
     Main entry function for OMEGA to A.U.T.O. conversion.
     :param omega_file: the HDF5 file to load the OMEGA data from.
@@ -194,27 +858,69 @@ def convert(omega_file="inD.hdf5", folder="pyauto/auto", cp=False, scenarios=Non
     :param start_offset: The offset to start sampling the scenarios from (in s).
     :param end_offset: The offset to end sampling the scenarios from (in s).
     :param max_scenario_duration: The maximum duration (in s) of a scenario - longer scenarios are ignored
-    :return: The scenarios as extracted by the OMEGA library from the HDF5 file as a list of owlready2 worlds.
+    :param workers: The number of worker processes to convert snippets in parallel. Default (None or 1) converts all
+        snippets sequentially in this process. Requires save_folder, as the converted scenarios can not be sent back
+        from the workers (snippets are converted sequentially otherwise).
+    :param save_folder: An optional folder in which each scenario is saved right after its conversion (as
+        scenario_<i>.owl with a corresponding .kbs file). In parallel mode, this happens within the worker, such that
+        the scenarios never have to be sent back to this process.
+    :param cache_tbox: Whether to load the A.U.T.O. TBox only once per process and clone it into each newly created
+        scene and scenery.
+    :param scenery_cache_folder: An optional path to a folder in which converted sceneries are stored, keyed by a hash
+        of their road network. Snippets with an already cached road network load their scenery from there instead of
+        converting it again.
+    :param lights_on_change: Whether to create the lamp individuals of a road user's vehicle lights only in scenes in
+        which the respective light's state has changed since the previous scene (and in the first scene of the road
+        user) instead of in every scene. Strongly reduces the number of individuals of long recordings.
+    :param weather_delta: Whether to describe the environment (precipitation, wind, air, etc.) only in scenes in which
+        the weather has changed since the previous scene. Other scenes get an environment referring to the IRI of the
+        last described environment via rdfs:seeAlso. The number of saved individuals is counted by the instrumentation
+        as individuals_saved.Weather.
+    :param states_on_change: Whether to create the Traffic_Light_State individual of a traffic light only in scenes in
+        which its state has changed since the previous scene (and in the first scene) instead of in every scene.
+    :param wkt_precision: The number of decimal places of coordinates in the WKT serializations of all geometries.
+        Default (-1) keeps the full precision of the recording.
+    :param lazy_load: Whether to read an index of the HDF5 file first and load only the dynamic objects that are alive
+        during the selected scenarios (or referenced by those), instead of all trajectories of the file. The road
+        network, states, weather and meta data are always loaded completely.
+    :param scene_workers: The number of worker processes to convert the scenes of each snippet in parallel, which allows
+        a single long snippet to use all cores. The scenery is converted once and shared by all workers via the
+        scenery cache. The frames of a snippet are partitioned into contiguous chunks, each converted by a worker that
+        continues the on-change and delta modes where the preceding chunk ended, such that the scenes are the same as in
+        a sequential conversion. Each chunk is saved as scenario_<i>_<k>.owl and the chunks are stitched in order into
+        scenario_<i>.kbs, whose path is returned (if exporting, the scenes are numbered across all chunks and the
+        scenery is exported once). Requires save_folder and takes precedence over workers, i.e. snippets are then
+        converted one after another.
+    :param bulk_triples: Whether to collect the data property assertions of road users and misc objects (physical
+        properties, bounding boxes, geometries and identifiers) per scene and insert them into the scene's quadstore in
+        one bulk operation, instead of setting them one by one through owlready2's property setters. Relies on the
+        internal schema of owlready2's SQLite quadstore. The values of these properties are not visible through the
+        individuals' attributes before the end of the respective conversion stage.
+    :param export_format: An optional format ("nt" for N-Triples or "ttl" for Turtle) to stream each scene to right
+        after its conversion, such that the scene can be released and memory stays flat regardless of the recording's
+        length. Requires save_folder. Scenes are written to scenario_<i>_<j>.nt (or .ttl) containing only the triples
+        created during the scene's conversion, the scenery to scenario_<i>_scenery.nt and the list of files (the
+        scenery first) to scenario_<i>.kbs. Each file declares its ontology and its imports (the A.U.T.O. ontologies
+        and, for scenes, the scenery). The paths to the .kbs files are returned instead of scenarios. Relations to
+        objects not converted in the same scene can not be exported and are dropped with a warning.
+    :param export_compress: Whether to gzip-compress the exported files (adds .gz to their names).
+    :param result_cache_folder: An optional path to a folder in which the outputs of conversions are cached, keyed by
+        the SHA-256 hash of the HDF5 file, all parameters influencing the output, the content of the A.U.T.O. folder and
+        the omega2auto version. On a cache hit, the paths to the cached scenarios (or .kbs files) are returned without
+        converting anything. Otherwise, the scenarios are saved into a temporary folder (instead of save_folder) which
+        becomes the cache entry once all snippets have been converted, such that concurrent conversions never see
+        incomplete entries.
+    :param instr: An optional omega2auto.instrumentation.Instrumentation which records per-stage timings and counters
+        of created individuals and triples, including those of worker processes.
+    :return: The scenarios as extracted by the OMEGA library from the HDF5 file as a list of owlready2 worlds (in the
+        order of the snippets), or, if save_folder or result_cache_folder is given, the list of paths to the saved
+        scenarios.
     """
-    if start_offset is None:
-        start_offset = 0
-    if end_offset is None:
-        end_offset = 0
-    loaded_scenarios = []
-    omega_data = _load_hdf5(omega_file)
-    logger.debug("Extracting snippets from OMEGA file")
-    # TODO revert once omega_format master has been updated
-    try:
-        omega_snippets = omega_data.extract_snippets(ids=scenarios)
-        if max_scenario_duration is not None:
-            omega_snippets = list(filter(
-                lambda x: (x.timestamps.val[-1] - x.timestamps.val[0]) <= max_scenario_duration, omega_snippets))
-    except AssertionError:
-        omega_snippets = [omega_data]
-    snippets_len = len(omega_snippets)
-    for i, rr in enumerate(omega_snippets):
-        logger.debug("Creating OWL worlds for snippet " + str(i) + "/" + str(snippets_len))
-        snippet_scenario = _to_auto(rr, hertz=hertz, start_offset=start_offset, end_offset=end_offset, folder=folder,
-                                    cp=cp)
-        loaded_scenarios.append(snippet_scenario)
-    return loaded_scenarios
+    return list(iter_convert(omega_file=omega_file, folder=folder, cp=cp, scenarios=scenarios, hertz=hertz,
+                             start_offset=start_offset, end_offset=end_offset,
+                             max_scenario_duration=max_scenario_duration, workers=workers, save_folder=save_folder,
+                             cache_tbox=cache_tbox, scenery_cache_folder=scenery_cache_folder,
+                             lights_on_change=lights_on_change, weather_delta=weather_delta,
+                             states_on_change=states_on_change, wkt_precision=wkt_precision, lazy_load=lazy_load,
+                             scene_workers=scene_workers, bulk_triples=bulk_triples, export_format=export_format,
+                             export_compress=export_compress, result_cache_folder=result_cache_folder, instr=instr))
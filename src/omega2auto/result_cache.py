@@ -0,0 +1,143 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import omega2auto
+
+# Logging
+logger = logging.getLogger(__name__)
+
+_MANIFEST_FILE = "manifest.json"
+# Size of the blocks in which the input file is read for hashing
+_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(filename: str) -> str:
+    """
+    :return: The SHA-256 hash of the content of the given file as a hex string.
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def folder_digest(folder: str) -> str:
+    """
+    :return: The SHA-256 hash of the relative paths and contents of all files within the given folder (recursively,
+        skipping hidden files and folders such as .git) as a hex string.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for file in sorted(f for f in files if not f.startswith(".")):
+            path = os.path.join(root, file)
+            name = os.path.relpath(path, folder).replace(os.sep, "/")
+            digest.update((name + "=" + file_digest(path) + "\n").encode())
+    return digest.hexdigest()
+
+
+def fingerprint(omega_file: str, params: dict, folder: str = None) -> str:
+    """
+    Computes the key of the conversion of the given file with the given parameters.
+    :param omega_file: The path to the OMEGA HDF5 file.
+    :param params: A JSON-serializable dictionary of all parameters that influence the converted output.
+    :param folder: The path to the folder in which A.U.T.O. is located, whose content is part of the key.
+    :return: The key as a hex string.
+    """
+    digest = hashlib.sha256()
+    digest.update(("omega2auto " + omega2auto.__version__ + " file=" + file_digest(omega_file) + " params=" +
+                   json.dumps(params, sort_keys=True, default=str)).encode())
+    if folder is not None:
+        digest.update((" ontologies=" + folder_digest(folder)).encode())
+    return digest.hexdigest()
+
+
+def load(cache_folder: str, key: str) -> list or None:
+    """
+    Looks up a conversion in the cache.
+    :param cache_folder: The path to the cache folder.
+    :param key: The key of the conversion, as returned by fingerprint(...).
+    :return: The list of paths to the saved scenarios (or .kbs files) in the order of the snippets, or None if the
+        conversion is not cached.
+    """
+    folder = os.path.join(cache_folder, key)
+    manifest_file = os.path.join(folder, _MANIFEST_FILE)
+    if not os.path.isfile(manifest_file):
+        return None
+    with open(manifest_file) as f:
+        manifest = json.load(f)
+    paths = [os.path.join(folder, file) for file in manifest["files"]]
+    if any(not os.path.exists(path) and not os.path.isfile(os.path.splitext(path)[0] + ".kbs") for path in paths):
+        logger.warning("Result cache entry %s is inconsistent, converting again", key)
+        return None
+    logger.debug("Loaded %d scenarios from result cache entry %s", len(paths), key)
+    return paths
+
+
+def prepare(cache_folder: str, key: str) -> str:
+    """
+    Creates a temporary folder for a new cache entry next to it, which becomes the entry once completed by save(...).
+    Concurrent conversions of the same entry thus never see (or remove) each other's partially written scenarios.
+    :param cache_folder: The path to the cache folder.
+    :param key: The key of the conversion.
+    :return: The path to the temporary folder, to be used as save folder of the conversion.
+    """
+    os.makedirs(cache_folder, exist_ok=True)
+    return tempfile.mkdtemp(prefix="." + key + ".", dir=cache_folder)
+
+
+def discard(folder: str):
+    """
+    Removes the temporary folder of a cache entry that will not be completed, e.g. as its conversion failed.
+    :param folder: The path to the temporary folder, as returned by prepare(...).
+    """
+    shutil.rmtree(folder, ignore_errors=True)
+
+
+def _replace_in_file(file: str, old: str, new: str):
+    with open(file) as f:
+        content = f.read()
+    if old in content:
+        with open(file, "w") as f:
+            f.write(content.replace(old, new))
+
+
+def save(cache_folder: str, key: str, tmp_folder: str, params: dict, paths: list) -> list:
+    """
+    Completes a cache entry after all scenarios have been saved into its temporary folder by renaming the folder. If
+    another process has completed the same entry in the meantime, the existing entry is kept.
+    :param cache_folder: The path to the cache folder.
+    :param key: The key of the conversion.
+    :param tmp_folder: The temporary folder of the entry, as returned by prepare(...).
+    :param params: The parameters of the conversion (stored for reference only).
+    :param paths: The list of paths to the saved scenarios (or .kbs files) in the order of the snippets.
+    :return: The list of paths to the scenarios within the completed cache entry.
+    """
+    folder = os.path.join(cache_folder, key)
+    files = [os.path.relpath(os.path.abspath(path), os.path.abspath(tmp_folder)) for path in paths]
+    # .kbs files listing absolute paths have to refer to the completed entry
+    for file in os.listdir(tmp_folder):
+        if file.endswith(".kbs"):
+            _replace_in_file(os.path.join(tmp_folder, file), os.path.abspath(tmp_folder), os.path.abspath(folder))
+    manifest = {"version": omega2auto.__version__, "params": params, "files": files}
+    with open(os.path.join(tmp_folder, _MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, default=str)
+    if os.path.isdir(folder) and not os.path.isfile(os.path.join(folder, _MANIFEST_FILE)):
+        # Incomplete entry of a previous version
+        shutil.rmtree(folder, ignore_errors=True)
+    try:
+        os.replace(tmp_folder, folder)
+    except OSError:
+        logger.debug("Result cache entry %s has been stored concurrently", key)
+        discard(tmp_folder)
+        existing = load(cache_folder, key)
+        if existing is not None:
+            return existing
+        raise
+    logger.debug("Stored %d scenarios in result cache entry %s", len(paths), key)
+    return [os.path.join(folder, file) for file in files]
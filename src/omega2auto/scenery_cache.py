@@ -0,0 +1,146 @@
+import enum
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+import omega2auto
+
+# Logging
+logger = logging.getLogger(__name__)
+
+_ABOX_FILE = "scenery.owl"
+_MAPPING_FILE = "mapping.json"
+
+
+def _walk(obj, path: str, digest, visited: dict):
+    """
+    Feeds the content of the given OMEGA object (recursively) into the digest. Each visited OMEGA object is assigned the
+    path under which it was first encountered, which identifies it across different loads of the same road network.
+    References to already visited objects (e.g. lane predecessors) are hashed by the path of the referenced object.
+    :param obj: The object to walk.
+    :param path: The path of the object.
+    :param digest: The hashlib digest to update.
+    :param visited: A dictionary from ids of visited objects to tuples of their path and the object itself.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str, enum.Enum, np.generic)):
+        digest.update(repr(obj).encode())
+    elif isinstance(obj, np.ndarray):
+        digest.update((str(obj.dtype) + str(obj.shape)).encode())
+        digest.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        digest.update(b"{")
+        for key, value in obj.items():
+            digest.update(repr(key).encode())
+            _walk(value, path + "/" + str(key), digest, visited)
+        digest.update(b"}")
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b"[")
+        for i, value in enumerate(obj):
+            _walk(value, path + "/" + str(i), digest, visited)
+        digest.update(b"]")
+    elif id(obj) in visited:
+        digest.update(("@" + visited[id(obj)][0]).encode())
+    else:
+        visited[id(obj)] = (path, obj)
+        digest.update(type(obj).__name__.encode())
+        fields = getattr(type(obj), "__fields__", None)
+        if fields:
+            names = list(fields)
+        else:
+            # Skips attributes added during conversion (e.g. last_owl_instance), which are not part of the content
+            names = sorted(k for k in vars(obj) if not k.startswith("_") and not k.startswith("owl_") and
+                           k not in ("last_owl_instance",))
+        for name in names:
+            digest.update(name.encode())
+            _walk(getattr(obj, name, None), path + "." + name, digest, visited)
+
+
+def fingerprint(rr, cp: bool, wkt_precision: int = -1) -> (str, dict):
+    """
+    Computes a content hash of the road network of the given reference recording.
+    :param rr: The reference recording.
+    :param cp: Whether the criticality phenomena ontologies are loaded (as this changes the converted scenery).
+    :param wkt_precision: The precision of the WKT serializations of the converted scenery.
+    :return: A tuple of the hash as a hex string and a dictionary from ids of the OMEGA objects of the road network to
+        tuples of their path and the object itself.
+    """
+    digest = hashlib.sha256()
+    digest.update(("omega2auto " + omega2auto.__version__ + " cp=" + str(cp) + " wkt_precision=" +
+                   str(wkt_precision)).encode())
+    visited = {}
+    _walk(rr.roads, "roads", digest, visited)
+    return digest.hexdigest(), visited
+
+
+def load(cache_folder: str, key: str, visited: dict, scenery_factory):
+    """
+    Loads a converted scenery from the cache.
+    :param cache_folder: The path to the cache folder.
+    :param key: The fingerprint of the road network.
+    :param visited: The dictionary of OMEGA objects of the road network, as returned by fingerprint(...).
+    :param scenery_factory: A function creating a new, empty scenery.
+    :return: A tuple of the scenery and the list of tuples of OMEGA objects and their OWL individuals, or None if the
+        road network is not cached.
+    """
+    folder = os.path.join(cache_folder, key)
+    abox_file = os.path.join(folder, _ABOX_FILE)
+    mapping_file = os.path.join(folder, _MAPPING_FILE)
+    if not os.path.isfile(abox_file) or not os.path.isfile(mapping_file):
+        return None
+    with open(mapping_file) as f:
+        mapping = json.load(f)
+    objects = {path: obj for path, obj in visited.values()}
+    scenery = scenery_factory()
+    scenery.get_ontology("file://" + os.path.abspath(abox_file)).load()
+    converted_entities = []
+    for path, iris in mapping:
+        individuals = [scenery.search_one(iri=iri) for iri in iris]
+        if path not in objects or any(x is None for x in individuals):
+            logger.warning("Scenery cache entry %s is inconsistent, converting scenery again", key)
+            return None
+        converted_entities.append((objects[path], individuals))
+    logger.debug("Loaded scenery from cache entry %s", key)
+    return scenery, converted_entities
+
+
+def save(cache_folder: str, key: str, visited: dict, scenery, converted_entities: list):
+    """
+    Stores a converted scenery in the cache. The entry is written into a temporary folder next to it first, which is
+    then renamed, such that concurrent processes (e.g. the workers of a parallel conversion) never see a partially
+    written entry. If another process has stored the same entry in the meantime, it is kept.
+    :param cache_folder: The path to the cache folder.
+    :param key: The fingerprint of the road network.
+    :param visited: The dictionary of OMEGA objects of the road network, as returned by fingerprint(...).
+    :param scenery: The converted scenery.
+    :param converted_entities: The list of tuples of OMEGA objects and their OWL individuals.
+    """
+    folder = os.path.join(cache_folder, key)
+    if os.path.isfile(os.path.join(folder, _MAPPING_FILE)):
+        logger.debug("Scenery cache entry %s has already been stored", key)
+        return
+    os.makedirs(cache_folder, exist_ok=True)
+    mapping = [(visited[id(obj)][0], [x.iri for x in individuals]) for obj, individuals in converted_entities
+               if id(obj) in visited]
+    tmp_folder = tempfile.mkdtemp(prefix="." + key + ".", dir=cache_folder)
+    try:
+        scenery.save_abox(os.path.join(tmp_folder, _ABOX_FILE))
+        with open(os.path.join(tmp_folder, _MAPPING_FILE), "w") as f:
+            json.dump(mapping, f)
+        if os.path.isdir(folder) and not os.path.isfile(os.path.join(folder, _MAPPING_FILE)):
+            # Incomplete entry of an interrupted conversion
+            shutil.rmtree(folder, ignore_errors=True)
+        try:
+            os.replace(tmp_folder, folder)
+        except OSError:
+            # Another process has stored the entry in the meantime
+            logger.debug("Scenery cache entry %s has been stored concurrently", key)
+            return
+    finally:
+        if os.path.isdir(tmp_folder):
+            shutil.rmtree(tmp_folder, ignore_errors=True)
+    logger.debug("Stored scenery in cache entry %s", key)
@@ -0,0 +1,91 @@
+import logging
+import os
+
+import owlready2
+from pyauto import auto
+from pyauto.models.scene import Scene
+from pyauto.models.scenery import Scenery
+
+# Logging
+logger = logging.getLogger(__name__)
+
+# Process-wide cache of worlds holding only the loaded A.U.T.O. TBox, keyed by (folder, cp)
+_templates = {}
+# The template the next created world is cloned from (consumed by the world's backend initialization)
+_clone_from = None
+
+
+class _TBoxClone:
+    """
+    Mixin for owlready2 worlds which initializes the world's quadstore as a clone of a cached TBox world. Since the
+    ontologies are then already present in the quadstore, owlready2 does not parse the ontology files again when pyauto
+    loads them into the new world.
+    """
+
+    def set_backend(self, backend="sqlite", filename=":memory:", *args, **kwargs):
+        global _clone_from
+        if _clone_from is not None and filename == ":memory:" and "clone" not in kwargs:
+            kwargs["clone"] = _clone_from.graph
+            _clone_from = None
+        super().set_backend(backend, filename, *args, **kwargs)
+
+
+class TBoxCachedScene(_TBoxClone, Scene):
+    pass
+
+
+class TBoxCachedScenery(_TBoxClone, Scenery):
+    pass
+
+
+def _get_template(folder: str, cp: bool) -> owlready2.World:
+    """
+    Returns the world holding the A.U.T.O. TBox for the given parameters, loads it on first use.
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies.
+    """
+    key = (os.path.abspath(folder) if folder else folder, cp)
+    if key not in _templates:
+        logger.debug("Loading A.U.T.O. TBox into cache from %s", folder)
+        template = owlready2.World()
+        auto.load(folder=folder, world=template, load_cp=cp)
+        _templates[key] = template
+    return _templates[key]
+
+
+def _create(world_cls, folder: str, cp: bool, **kwargs):
+    global _clone_from
+    _clone_from = _get_template(folder, cp)
+    try:
+        return world_cls(folder=folder, load_cp=cp, **kwargs)
+    finally:
+        _clone_from = None
+
+
+def create_scene(timestamp: float, folder: str, cp: bool, scenery: Scenery = None) -> Scene:
+    """
+    Creates a new scene whose TBox is cloned from the process-wide TBox cache instead of being loaded from the files.
+    :param timestamp: The timestamp of the scene.
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies.
+    :param scenery: The scenery of the scene.
+    """
+    return _create(TBoxCachedScene, folder, cp, timestamp=timestamp, scenery=scenery)
+
+
+def create_scenery(folder: str, cp: bool) -> Scenery:
+    """
+    Creates a new scenery whose TBox is cloned from the process-wide TBox cache instead of being loaded from the files.
+    :param folder: The path to the folder in which A.U.T.O. is located.
+    :param cp: Whether to also load the two criticality phenomena ontologies.
+    """
+    return _create(TBoxCachedScenery, folder, cp)
+
+
+def clear():
+    """
+    Clears the process-wide TBox cache.
+    """
+    for template in _templates.values():
+        template.close()
+    _templates.clear()
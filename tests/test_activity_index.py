@@ -0,0 +1,68 @@
+import types
+
+import numpy as np
+
+from omega2auto.activity_index import ActivityIndex
+
+
+def _objects(*lifetimes):
+    return {"ru%d" % i: types.SimpleNamespace(birth=birth, end=end) for i, (birth, end) in enumerate(lifetimes)}
+
+
+def _keys(items):
+    return [k for k, _ in items]
+
+
+def test_active_at_boundaries():
+    index = ActivityIndex(_objects((2, 4), (0, 2), (4, 6)))
+    assert _keys(index.active_at(1)) == ["ru1"]
+    assert _keys(index.active_at(2)) == ["ru0", "ru1"]
+    assert _keys(index.active_at(3)) == ["ru0"]
+    assert _keys(index.active_at(4)) == ["ru0", "ru2"]
+    assert _keys(index.active_at(6)) == ["ru2"]
+    assert _keys(index.active_at(7)) == []
+
+
+def test_sweep_boundaries():
+    objects = _objects((2, 4), (0, 2), (4, 6))
+    steps = {frame: (_keys(entered), _keys(left), _keys(active))
+             for frame, entered, left, active in ActivityIndex(objects).sweep(range(8))}
+    assert steps[0] == (["ru1"], [], ["ru1"])
+    # Objects are still active in their end frame and leave in the frame after
+    assert steps[2] == (["ru0"], [], ["ru0", "ru1"])
+    assert steps[3] == ([], ["ru1"], ["ru0"])
+    assert steps[4] == (["ru2"], [], ["ru0", "ru2"])
+    assert steps[5] == ([], ["ru0"], ["ru2"])
+    assert steps[7] == ([], ["ru2"], [])
+
+
+def test_single_frame_road_users():
+    objects = _objects((3, 3), (3, 5), (1, 1))
+    steps = {frame: (_keys(entered), _keys(left), _keys(active))
+             for frame, entered, left, active in ActivityIndex(objects).sweep(range(6))}
+    assert steps[1] == (["ru2"], [], ["ru2"])
+    assert steps[2] == ([], ["ru2"], [])
+    assert steps[3] == (["ru0", "ru1"], [], ["ru0", "ru1"])
+    assert steps[4] == ([], ["ru0"], ["ru1"])
+
+
+def test_sweep_skipping_single_frame_road_user():
+    # A road user living only between two swept frames is never reported
+    index = ActivityIndex(_objects((3, 3), (0, 10)))
+    for frame, entered, left, active in index.sweep([0, 2, 4, 6]):
+        assert "ru0" not in _keys(entered) + _keys(left) + _keys(active)
+
+
+def test_sweep_matches_active_at():
+    rng = np.random.default_rng(0)
+    births = rng.integers(0, 50, 40)
+    index = ActivityIndex(_objects(*zip(births, births + rng.integers(0, 20, 40))))
+    for frame, _, _, active in index.sweep(range(0, 80, 3)):
+        assert active == index.active_at(frame)
+
+
+def test_empty_recording():
+    index = ActivityIndex({})
+    assert len(index) == 0
+    assert index.active_at(0) == []
+    assert list(index.sweep(range(3))) == [(0, [], [], []), (1, [], [], []), (2, [], [], [])]
@@ -0,0 +1,97 @@
+import math
+import os
+
+import pytest
+
+owlready2 = pytest.importorskip("owlready2")
+
+from omega2auto import export  # noqa: E402
+
+
+def _create_tbox(world):
+    tbox = world.get_ontology("http://test.org/tbox#")
+    with tbox:
+        class Road(owlready2.Thing):
+            pass
+
+        class Car(owlready2.Thing):
+            pass
+
+        class has_speed(owlready2.DataProperty):
+            range = [float]
+
+        class drives_on(owlready2.ObjectProperty):
+            pass
+    return tbox
+
+
+def _export(tmp_path, tbox_file, speeds):
+    """
+    Creates a scenery and a scene world (each with the TBox loaded before the export mark, like in the conversion) and
+    exports them.
+    """
+    exporter = export.ScenarioExporter(str(tmp_path / "scenario_0"))
+
+    scenery = owlready2.World()
+    tbox = scenery.get_ontology("file://" + tbox_file).load()
+    scenery_abox = scenery.get_ontology("http://test.org/scenery#")
+    scenery_abox.imported_ontologies.append(tbox)
+    exporter.begin(scenery)
+    tbox.Road("road1", namespace=scenery_abox)
+    exporter.export_scenery(scenery)
+
+    scene = owlready2.World()
+    tbox = scene.get_ontology("file://" + tbox_file).load()
+    scene_abox = scene.get_ontology("http://test.org/scene_0#")
+    scene_abox.imported_ontologies.append(tbox)
+    exporter.begin(scene)
+    car = tbox.Car("car1", namespace=scene_abox)
+    car.has_speed = speeds
+    road = scene._abbreviate("http://test.org/scenery#road1")
+    scene_abox._add_obj_triple_spo(car.storid, tbox.drives_on.storid, road)
+    exporter.export_scene(scene)
+    return exporter.finish()
+
+
+@pytest.fixture
+def tbox_file(tmp_path):
+    tbox = _create_tbox(owlready2.World())
+    file = str(tmp_path / "tbox.owl")
+    tbox.save(file)
+    return file
+
+
+def test_kbs_lists_scenery_first(tmp_path, tbox_file):
+    kbs_file = _export(tmp_path, tbox_file, [1.5])
+    with open(kbs_file) as f:
+        assert f.read().splitlines() == ["scenario_0_scenery.nt", "scenario_0_0.nt"]
+
+
+def test_scene_declares_ontology_and_imports(tmp_path, tbox_file):
+    _export(tmp_path, tbox_file, [math.nan, math.inf])
+    with open(tmp_path / "scenario_0_0.nt") as f:
+        lines = f.read().splitlines()
+    owl = "http://www.w3.org/2002/07/owl#"
+    rdf = "http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+    assert lines[0] == "<http://test.org/scene_0> <%stype> <%sOntology> ." % (rdf, owl)
+    assert "<http://test.org/scene_0> <%simports> <http://test.org/scenery> ." % owl in lines
+    assert "<http://test.org/scene_0> <%simports> <http://test.org/tbox> ." % owl in lines
+    assert any(line.endswith("\"NaN\"^^<http://www.w3.org/2001/XMLSchema#double> .") for line in lines)
+    assert any(line.endswith("\"INF\"^^<http://www.w3.org/2001/XMLSchema#double> .") for line in lines)
+
+
+def test_round_trip(tmp_path, tbox_file):
+    # Note: NaN can not be loaded back, as owlready2 stores it as NULL
+    kbs_file = _export(tmp_path, tbox_file, [1.5, math.inf, 1e-7])
+    world = owlready2.World()
+    world.get_ontology("file://" + tbox_file).load()
+    with open(kbs_file) as f:
+        for file in f.read().splitlines():
+            world.get_ontology("file://" + os.path.join(str(tmp_path), file)).load()
+    road = world["http://test.org/scenery#road1"]
+    car = world["http://test.org/scene_0#car1"]
+    assert road is not None and car is not None
+    assert car.drives_on == [road]
+    assert sorted(car.has_speed) == [1e-7, 1.5, math.inf]
+    imported = world.get_ontology("http://test.org/scene_0#").imported_ontologies
+    assert {x.base_iri for x in imported} == {"http://test.org/scenery#", "http://test.org/tbox#"}
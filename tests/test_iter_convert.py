@@ -0,0 +1,82 @@
+import gc
+import weakref
+
+import pytest
+
+from omega2auto import omega2auto
+
+
+class _World:
+    pass
+
+
+class _Object:
+    pass
+
+
+class _Snippet:
+    def __init__(self, road):
+        self.road_users = {0: _Object()}
+        self.roads = {0: road}
+
+
+class _Recording:
+    def __init__(self, snippets):
+        self.snippets = snippets
+
+    def extract_snippets(self, ids=None):
+        return list(self.snippets)
+
+
+def _convert_snippet(i, rr, save_folder, to_auto_args, instrumented=False, scene_workers=None):
+    """
+    Fake conversion, referencing the converted worlds from the OMEGA objects like the converters do.
+    """
+    scenery, scene = _World(), _World()
+    rr.roads[0].last_owl_instance = [scenery]
+    rr.roads[0].owl_geometry = scenery
+    rr.road_users[0].last_owl_instance = [scene]
+    rr.road_users[0].owl_entity = [(rr.road_users[0], [scene])]
+    rr.road_users[0].last_light_frame = 0
+    scene.scenery = scenery
+    return scene, None
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    # The road network is shared by all snippets
+    road = _Object()
+    recording = _Recording([_Snippet(road) for _ in range(4)])
+    monkeypatch.setattr(omega2auto, "_load_hdf5", lambda *args, **kwargs: recording)
+    monkeypatch.setattr(omega2auto, "_convert_snippet", _convert_snippet)
+    return recording
+
+
+def test_earlier_worlds_are_released(recording):
+    scenes = []
+    sceneries = []
+    for scenario in omega2auto.iter_convert("recording.hdf5"):
+        scenes.append(weakref.ref(scenario))
+        sceneries.append(weakref.ref(scenario.scenery))
+        del scenario
+        gc.collect()
+        assert all(ref() is None for ref in scenes[:-1] + sceneries[:-1])
+    assert len(scenes) == 4
+
+
+def test_released_snippets_keep_no_conversion_state(recording):
+    for _ in omega2auto.iter_convert("recording.hdf5"):
+        pass
+    for snippet in recording.snippets[:-1]:
+        assert vars(snippet.road_users[0]) == {}
+
+
+def test_no_qualifying_snippet_converts_nothing(recording, monkeypatch):
+    def extract_snippets(ids=None):
+        # Mimics omega_format, which falls back to the whole recording for an empty list of IDs
+        assert ids is None or len(ids) > 0
+        return list(recording.snippets)
+
+    monkeypatch.setattr(recording, "extract_snippets", extract_snippets)
+    monkeypatch.setattr(omega2auto, "_select_snippet_ids", lambda *args: ([], len(recording.snippets)))
+    assert list(omega2auto.iter_convert("recording.hdf5", max_scenario_duration=1)) == []
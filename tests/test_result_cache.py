@@ -0,0 +1,46 @@
+import os
+
+from omega2auto import result_cache
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(str(path), "w") as f:
+        f.write(content)
+
+
+def test_fingerprint_depends_on_ontologies(tmp_path):
+    _write(tmp_path / "recording.hdf5", "omega")
+    _write(tmp_path / "auto" / "l1_core.owl", "1")
+    _write(tmp_path / "auto" / ".git" / "HEAD", "a")
+    key = result_cache.fingerprint(str(tmp_path / "recording.hdf5"), {"hertz": 5}, str(tmp_path / "auto"))
+    _write(tmp_path / "auto" / ".git" / "HEAD", "b")
+    assert result_cache.fingerprint(str(tmp_path / "recording.hdf5"), {"hertz": 5}, str(tmp_path / "auto")) == key
+    _write(tmp_path / "auto" / "l1_core.owl", "2")
+    assert result_cache.fingerprint(str(tmp_path / "recording.hdf5"), {"hertz": 5}, str(tmp_path / "auto")) != key
+
+
+def test_entry_is_completed_by_save(tmp_path):
+    cache = str(tmp_path / "cache")
+    folder = result_cache.prepare(cache, "key")
+    assert result_cache.load(cache, "key") is None
+    _write(os.path.join(folder, "scenario_0_0.owl"), "")
+    _write(os.path.join(folder, "scenario_0.kbs"), os.path.join(os.path.abspath(folder), "scenario_0_0.owl") + "\n")
+    paths = result_cache.save(cache, "key", folder, {}, [os.path.join(folder, "scenario_0.kbs")])
+    assert paths == [os.path.join(cache, "key", "scenario_0.kbs")]
+    assert result_cache.load(cache, "key") == paths
+    assert not os.path.exists(folder)
+    with open(paths[0]) as f:
+        assert f.read() == os.path.join(os.path.abspath(os.path.join(cache, "key")), "scenario_0_0.owl") + "\n"
+
+
+def test_concurrently_completed_entry_is_kept(tmp_path):
+    cache = str(tmp_path / "cache")
+    first, second = result_cache.prepare(cache, "key"), result_cache.prepare(cache, "key")
+    _write(os.path.join(first, "scenario_0.kbs"), "first")
+    _write(os.path.join(second, "scenario_0.kbs"), "second")
+    paths = result_cache.save(cache, "key", first, {}, [os.path.join(first, "scenario_0.kbs")])
+    assert result_cache.save(cache, "key", second, {}, [os.path.join(second, "scenario_0.kbs")]) == paths
+    assert os.listdir(cache) == ["key"]
+    with open(paths[0]) as f:
+        assert f.read() == "first"
@@ -0,0 +1,21 @@
+import pytest
+import shapely
+
+pytest.importorskip("pyauto")
+pytest.importorskip("omega_format")
+
+from omega2auto.converter_functions.road import road  # noqa: E402
+
+
+def test_road_geometry_is_union_of_lanes():
+    geom = road.get_road_geometry([shapely.box(0, 0, 1, 2), shapely.box(1, 0, 2, 2)])
+    assert geom.equals(shapely.box(0, 0, 2, 2))
+
+
+def test_road_geometry_repairs_self_intersecting_lane():
+    bow_tie = shapely.Polygon([(0, 0), (2, 2), (2, 0), (0, 2)])
+    assert not bow_tie.is_valid
+    geom = road.get_road_geometry([bow_tie, shapely.box(2, 0, 3, 2)])
+    assert geom.is_valid
+    assert geom.area == pytest.approx(4)
+    assert geom.contains(shapely.Point(1.5, 1)) and geom.contains(shapely.Point(2.5, 1))
@@ -0,0 +1,90 @@
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyauto")
+omega_format = pytest.importorskip("omega_format")
+
+from omega2auto.converter_functions.road import state  # noqa: E402
+
+GREEN = int(omega_format.ReferenceTypes.StateValue.GREEN)
+RED = int(omega_format.ReferenceTypes.StateValue.RED)
+
+
+class _Individual:
+    def __init__(self, name):
+        self.name = name
+        self.is_a = []
+        self.delivers_signal = []
+
+
+class _Ontology:
+    """
+    Fake ontology whose classes create fake individuals, recording them in the scene.
+    """
+
+    def __init__(self, scene):
+        self._scene = scene
+
+    def __getattr__(self, name):
+        def create():
+            individual = _Individual(name)
+            self._scene.individuals.append(individual)
+            return individual
+        return create
+
+
+class _Scene:
+    def __init__(self):
+        self.individuals = []
+
+    def ontology(self, _):
+        return _Ontology(self)
+
+
+def _make_state(values):
+    sign = types.SimpleNamespace(last_owl_instance=[_Individual("Traffic_Light")])
+    return types.SimpleNamespace(value=np.asarray(values), sign=sign)
+
+
+def _count_states(rr_state, scene_numbers, on_change):
+    count = 0
+    for scene_number in scene_numbers:
+        scene = _Scene()
+        state.to_auto(rr_state, scene, scene_number, on_change=on_change)
+        count += sum(1 for x in scene.individuals if x.name == "Traffic_Light_State")
+    return count
+
+
+def test_state_segments():
+    starts, values = state.get_state_segments(_make_state([GREEN, GREEN, RED, RED, RED, GREEN]))
+    assert starts.tolist() == [0, 2, 5]
+    assert values.tolist() == [GREEN, RED, GREEN]
+
+
+def test_state_segments_empty():
+    starts, values = state.get_state_segments(_make_state([]))
+    assert len(starts) == 0
+    assert len(values) == 0
+
+
+def test_states_in_every_frame():
+    rr_state = _make_state([GREEN, GREEN, RED, RED, RED, GREEN])
+    assert _count_states(rr_state, range(6), on_change=False) == 6
+
+
+def test_states_on_change():
+    rr_state = _make_state([GREEN, GREEN, RED, RED, RED, GREEN])
+    assert _count_states(rr_state, range(6), on_change=True) == 3
+
+
+def test_states_on_change_down_sampled():
+    rr_state = _make_state([GREEN, GREEN, RED, RED, RED, GREEN])
+    assert _count_states(rr_state, [0, 2, 4], on_change=True) == 2
+
+
+def test_states_beyond_recorded_values():
+    rr_state = _make_state([GREEN, RED])
+    assert _count_states(rr_state, range(4), on_change=False) == 2
+    assert _count_states(_make_state([GREEN, RED]), range(4), on_change=True) == 2
@@ -0,0 +1,119 @@
+import types
+
+import numpy as np
+import pytest
+import shapely
+from shapely import affinity
+
+pytest.importorskip("pyauto")
+pytest.importorskip("omega_format")
+
+from omega2auto.converter_functions import utils  # noqa: E402
+
+
+def _trajectory(x, y, z, heading):
+    return types.SimpleNamespace(tr=types.SimpleNamespace(pos_x=np.asarray(x, dtype=float),
+                                                          pos_y=np.asarray(y, dtype=float),
+                                                          pos_z=np.asarray(z, dtype=float),
+                                                          heading=np.asarray(heading, dtype=float)))
+
+
+def _rotated_bounding_box(x, y, z, heading, length, width, height):
+    """
+    Rotates the axis-aligned bounding box of a single frame using shapely.
+    """
+    l11 = (x - 0.5 * length, y - 0.5 * width, z)
+    l12 = (x - 0.5 * length, y + 0.5 * width, z)
+    l21 = (x + 0.5 * length, y - 0.5 * width, z)
+    l22 = (x + 0.5 * length, y + 0.5 * width, z)
+    h11 = (x - 0.5 * length, y - 0.5 * width, z + height)
+    h12 = (x - 0.5 * length, y + 0.5 * width, z + height)
+    h21 = (x + 0.5 * length, y - 0.5 * width, z + height)
+    h22 = (x + 0.5 * length, y + 0.5 * width, z + height)
+    bb = shapely.Polygon([l11, l12, l22, l21, l11, h11, h12, h22, h21, h11, l11, l12, h12, h22, l22, l21, h21, h11,
+                          l11])
+    return affinity.rotate(bb, heading, origin="centroid")
+
+
+@pytest.mark.parametrize("length, width, height", [(4.5, 1.8, 1.5), (12.0, 2.5, 3.2), (0.8, 0.6, 1.7)])
+def test_trajectory_bounding_boxes_match_shapely(length, width, height):
+    headings = [0, 30, 45, 90, 135.5, 180, 270, 359, -60]
+    n = len(headings)
+    x = np.linspace(-50.3, 420.7, n)
+    y = np.linspace(13.1, -250.9, n)
+    z = np.linspace(0, 2.5, n)
+    cls = _trajectory(x, y, z, headings)
+    boxes = utils._trajectory_bounding_boxes(cls, length, width, height)
+    assert len(boxes) == n
+    for i, box in enumerate(boxes):
+        expected = _rotated_bounding_box(x[i], y[i], z[i], headings[i], length, width, height)
+        np.testing.assert_allclose(shapely.get_coordinates(box, include_z=True),
+                                   shapely.get_coordinates(expected, include_z=True), atol=1e-9)
+
+
+def test_trajectory_bounding_boxes_of_empty_trajectory():
+    assert len(utils._trajectory_bounding_boxes(_trajectory([], [], [], []), 4.5, 1.8, 1.5)) == 0
+
+
+class _Lane:
+    def __init__(self, geometry):
+        self.hasGeometry = [types.SimpleNamespace(asWKT=[shapely.to_wkt(geometry)])]
+
+
+class _Scenery:
+    """
+    Fake scenery whose driveable lanes geometry is the union of the given lanes, as computed by A.U.T.O.
+    """
+
+    def __init__(self, lanes):
+        self._lanes = lanes
+        self._individuals = {"http://lane_%d" % i: _Lane(lane) for i, lane in enumerate(lanes)}
+
+    def __getitem__(self, iri):
+        return self._individuals.get(iri)
+
+    def get_all_driveable_lanes_geometry(self):
+        return shapely.union_all(self._lanes)
+
+
+# Two adjacent lanes and a separate one
+_LANES = [shapely.box(0, 0, 100, 3.5), shapely.box(0, 3.5, 100, 7), shapely.box(200, 0, 300, 3.5)]
+
+
+def _sceneries():
+    # Lane geometries kept in memory during conversion
+    converted = _Scenery(_LANES)
+    for lane in _LANES:
+        utils.add_driveable_lane_geometry(converted, lane)
+    # Scenery loaded from the cache, lanes are only known by their WKT
+    cached = _Scenery(_LANES)
+    cached.individual_index = {"driveable_lanes": list(cached._individuals.keys())}
+    # Scenery without any index
+    plain = _Scenery(_LANES)
+    return [converted, cached, plain]
+
+
+def _bounding_boxes():
+    rng = np.random.default_rng(0)
+    n = 200
+    x = np.concatenate([[50, 50, 250, 98, 150, 500], rng.uniform(-10, 310, n)])
+    y = np.concatenate([[1.75, 3.5, 1.75, 1.75, 1.75, 500], rng.uniform(-3, 10, n)])
+    heading = np.concatenate([[0, 0, 0, 0, 0, 0], rng.uniform(0, 360, n)])
+    return utils._trajectory_bounding_boxes(_trajectory(x, y, np.zeros(len(x)), heading), 4.5, 1.8, 1.5)
+
+
+@pytest.mark.parametrize("scenery", _sceneries(), ids=["converted", "cached", "plain"])
+def test_driveable_lanes_index_matches_containment(scenery):
+    boxes = _bounding_boxes()
+    lanes_geom = _Scenery(_LANES).get_all_driveable_lanes_geometry()
+    expected = np.array([lanes_geom.contains(box) for box in boxes])
+    result = utils.DriveableLanesIndex(scenery).contains(boxes)
+    np.testing.assert_array_equal(result, expected)
+    # Within a lane, across the adjacent lanes, within the separate lane, partly outside, between and far away
+    np.testing.assert_array_equal(result[:6], [True, True, True, False, False, False])
+
+
+def test_driveable_lanes_index_without_lanes():
+    scenery = _Scenery([])
+    scenery.individual_index = {"driveable_lanes": []}
+    assert not np.any(utils.DriveableLanesIndex(scenery).contains(_bounding_boxes()))
@@ -0,0 +1,49 @@
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyauto")
+pytest.importorskip("omega_format")
+
+from omega2auto.converter_functions.weather import weather  # noqa: E402
+
+
+class _Group:
+    """
+    Fake group of weather information, all information not given is unrecorded.
+    """
+
+    def __init__(self, **arrays):
+        self.__dict__.update(arrays)
+
+    def __getattr__(self, name):
+        return np.array([])
+
+
+def _weather(air_temp, humidity=()):
+    cls = types.SimpleNamespace(**{name: _Group() for name in [
+        "precipitation", "wind", "gust_of_wind", "cloudiness", "visibility", "air_pressure", "road_condition",
+        "solar"]})
+    cls.temperature = _Group(air_temp=np.asarray(air_temp, dtype=float))
+    cls.humidity = _Group(humidity=np.asarray(humidity, dtype=float))
+    return cls
+
+
+def test_runs_of_identical_values():
+    runs = weather.get_weather_runs(_weather([10, 10, 12, 12, 12], [50, 50, 50, 60, 60]))
+    np.testing.assert_array_equal(runs, [0, 0, 1, 2, 2])
+
+
+def test_runs_of_missing_values():
+    runs = weather.get_weather_runs(_weather([np.nan, np.nan, 10, 10, np.nan, np.nan]))
+    np.testing.assert_array_equal(runs, [0, 0, 1, 1, 2, 2])
+
+
+def test_runs_of_unrecorded_information():
+    runs = weather.get_weather_runs(_weather([np.nan, np.nan, np.nan], [50, 50]))
+    np.testing.assert_array_equal(runs, [0, 0, 1])
+
+
+def test_runs_of_empty_weather():
+    assert len(weather.get_weather_runs(_weather([]))) == 0